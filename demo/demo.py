@@ -4,6 +4,7 @@ import argparse
 import os
 import pickle
 import sys
+from functools import partial
 from pathlib import Path
 import networkx as nx
 import osmnx as ox
@@ -16,21 +17,31 @@ if SRC_DIR not in sys.path:
 
 from drone.model import chinese_postman
 from carp_mvp import CARPSolver, analyze_solution_quality
+from contraction import contract_deadhead_chains, expand_node_path
+from ch_index import ShortestPathIndex
 
 def load_pickle_graph(path: str):
     with open(path, "rb") as f:
         return pickle.load(f)
 
 
-def build_route_nodes(G: nx.Graph, depot: int, edges):
-  
+def load_index(path: str | None):
+    return ShortestPathIndex.load(path) if path else None
+
+
+def build_route_nodes(G: nx.Graph, depot: int, edges, sp_index=None):
+    # un index d'un autre graphe (graph_full pour un secteur) donnerait des chemins hors de G
+    if sp_index is not None and sp_index.covers(G):
+        shortest_path = sp_index.path
+    else:
+        shortest_path = partial(nx.shortest_path, G, weight="length")
     route = [depot]
     cur = depot
 
     for u, v, _ in edges:
        
         if cur not in (u, v):
-            sp = nx.shortest_path(G, cur, u, weight="length")
+            sp = shortest_path(cur, u)
             route.extend(sp[1:])  
             cur = u
        
@@ -39,13 +50,13 @@ def build_route_nodes(G: nx.Graph, depot: int, edges):
         cur = nxt
 
     if cur != depot:
-        sp = nx.shortest_path(G, cur, depot, weight="length")
+        sp = shortest_path(cur, depot)
         route.extend(sp[1:])
     return route
 
-def demo_drone(graph_path: str, out_png: str):
+def demo_drone(graph_path: str, out_png: str, index_path: str | None = None):
     G = load_pickle_graph(graph_path)
-    path_nodes, dist_m = chinese_postman(G)
+    path_nodes, dist_m = chinese_postman(G, sp_index=load_index(index_path))
     print(f"Drone tour length : {dist_m/1000:.2f} km")
 
     fig, _ = ox.plot_graph_route(
@@ -58,7 +69,9 @@ def demo_drone(graph_path: str, out_png: str):
     print("Map written to", out_png)
 
 
-def demo_vehicle(graph_path: str, capacity_h: float, out_png: str | None):
+def demo_vehicle(graph_path: str, capacity_h: float, out_png: str | None,
+                 depots: list[int] | None = None, contract: bool = False,
+                 index_path: str | None = None):
     G = load_pickle_graph(graph_path)
 
     if not any(d.get("required", False) for _, _, d in G.edges(data=True)):
@@ -66,10 +79,18 @@ def demo_vehicle(graph_path: str, capacity_h: float, out_png: str | None):
         for _, _, d in G.edges(data=True):
             d["required"] = True
 
-    solver = CARPSolver(capacity_limit=capacity_h)
+    sp_index = load_index(index_path)
+    solver = CARPSolver(capacity_limit=capacity_h, sp_index=sp_index)
     solver.depot_node = next(iter(G.nodes())) 
 
-    tours = solver.compute_tournees(G, strategy="mixed")
+    H = G
+    if contract:
+        H = contract_deadhead_chains(G, keep=depots or [solver.depot_node])
+
+    if depots:
+        tours = solver.compute_tournees_multi_depot(H, depots, strategy="mixed")
+    else:
+        tours = solver.compute_tournees(H, strategy="mixed")
     stats = analyze_solution_quality(tours)
 
     print("=== CARP stats ===")
@@ -77,7 +98,11 @@ def demo_vehicle(graph_path: str, capacity_h: float, out_png: str | None):
         print(f"{k}: {v}")
 
     if out_png and tours:
-        nodes_seq = build_route_nodes(G, solver.depot_node, tours[0]["edges"])
+        depot = tours[0].get("depot", solver.depot_node)
+        if contract:
+            nodes_seq = expand_node_path(H, build_route_nodes(H, depot, tours[0]["edges"]))
+        else:
+            nodes_seq = build_route_nodes(G, depot, tours[0]["edges"], sp_index)
         fig, _ = ox.plot_graph_route(
             G.to_undirected(), nodes_seq,
             node_size=0, route_color="blue", route_linewidth=1,
@@ -94,17 +119,21 @@ def main():
     pd = sub.add_parser("drone", help="Run Chinese‑Postman tour on full graph")
     pd.add_argument("--graph", required=True, help="Pickle graph file")
     pd.add_argument("--out", required=True, help="Output PNG path")
+    pd.add_argument("--index", help="Undirected shortest-path index (.ch_und.npz)")
 
     pv = sub.add_parser("vehicle", help="Run CARP solver on sector graph")
     pv.add_argument("--sector", required=True, help="Pickle sector graph file")
     pv.add_argument("--capacity", type=float, default=8.0, help="Vehicle time capacity (h)")
     pv.add_argument("--out", help="Output PNG path for first tour (optional)")
+    pv.add_argument("--depots", type=int, nargs="+", help="Depot node ids (multi-depot mode)")
+    pv.add_argument("--contract", action="store_true", help="Contract deadhead-only chains before routing")
+    pv.add_argument("--index", help="Directed shortest-path index (.ch.npz)")
 
     args = p.parse_args()
     if args.cmd == "drone":
-        demo_drone(args.graph, args.out)
+        demo_drone(args.graph, args.out, args.index)
     else:
-        demo_vehicle(args.sector, args.capacity, args.out)
+        demo_vehicle(args.sector, args.capacity, args.out, args.depots, args.contract, args.index)
 
 
 if __name__ == "__main__":
@@ -3,12 +3,20 @@ from __future__ import annotations
 import argparse
 import pathlib
 import pickle
+import sys
 from typing import Dict, Tuple, List
 import matplotlib
 import matplotlib.animation as animation
 import matplotlib.pyplot as plt
 import networkx as nx
 
+SRC_DIR = pathlib.Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ch_index import ShortestPathIndex
+from drone.model import eulerian_augment
+
 if matplotlib.get_backend() == "Agg":
     print("[INFO] Backend 'Agg' détecté : aucune fenêtre interactive – une vidéo sera exportée.")
 
@@ -38,10 +46,12 @@ def make_undirected(G: nx.Graph) -> nx.MultiGraph:
         G = nx.MultiGraph(G)
     return G
 
-def compute_eulerian_tour(G: nx.Graph):
+def compute_eulerian_tour(G: nx.Graph, sp_index: ShortestPathIndex | None = None):
+    if sp_index is not None:
+        sp_index.check_graph(G)
     H = make_undirected(G)
     if not nx.is_eulerian(H):
-        H = nx.eulerize(H)
+        H = nx.eulerize(H) if sp_index is None else eulerian_augment(H, weight="length", sp_index=sp_index)
     return list(nx.eulerian_circuit(H)), H
 
 def animate(
@@ -107,6 +117,7 @@ def parse_args():
     p.add_argument("--interval", type=int, default=100, help="Intervalle ms entre frames (≥30 recommandé)")
     p.add_argument("--out", type=str, default="animation_out.mp4", help="Nom du fichier MP4 si export")
     p.add_argument("--blit", action="store_true", help="Active le blitting (plus rapide mais exigeant)")
+    p.add_argument("--index", type=str, help="Index de plus courts chemins non orienté (.ch_und.npz)")
     return p.parse_args()
 
 def main():
@@ -122,7 +133,8 @@ def main():
         G = load_graph_pickle(gpath)
 
     pos = get_node_positions(G)
-    tour, H = compute_eulerian_tour(G)
+    sp_index = ShortestPathIndex.load(args.index) if args.index else None
+    tour, H = compute_eulerian_tour(G, sp_index)
 
     animate(H, pos, tour, speed=args.speed, interval=args.interval, outfile=args.out, blit=args.blit)
 
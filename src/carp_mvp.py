@@ -1,20 +1,33 @@
 import networkx as nx
 import random
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, Sequence
+import math
 import time
 import logging
 
+try:
+    from .contraction import HOPS, edge_hops, hop_lengths, hop_weight
+    from .validation import validate_tournees
+except ImportError:
+    from contraction import HOPS, edge_hops, hop_lengths, hop_weight
+    from validation import validate_tournees
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class CARPSolver:
     
-    def __init__(self, capacity_limit: float = 8.0, speed_kmh: float = 10.0):
+    def __init__(self, capacity_limit: float = 8.0, speed_kmh: float = 10.0, depot_node: int = 0,
+                 sp_index=None):
         self.capacity_limit = capacity_limit
         self.speed_kmh = speed_kmh
-        self.depot_node = 0
+        self.depot_node = depot_node
+        self.sp_index = sp_index
+        self.unserved_edges: List[Tuple] = []
         
     def compute_tournees(self, G: nx.Graph, strategy: str = "mixed") -> List[Dict]:
         start_time = time.time()
+        self.unserved_edges = []
         
         required_edges = self._get_required_edges(G)
         if not required_edges:
@@ -23,11 +36,26 @@ class CARPSolver:
         
         logging.info(f"Traitement de {len(required_edges)} arêtes requises")
         
-        shortest_paths = dict(nx.all_pairs_shortest_path_length(G))
-        
-        tournees = self._path_scanning_algorithm(
-            G, required_edges, shortest_paths, strategy
-        )
+        if strategy == "split":
+            if self.sp_index is not None:
+                # le tour géant est construit et découpé en sauts (BFS, circuit eulérien) :
+                # le passer en km CH demanderait une requête point-à-point (~3 ms sur
+                # 10k nœuds) par discontinuité du tour, trop lent sur une ville entière,
+                # et mélanger sauts et km rendrait les heures incomparables
+                raise ValueError("strategy='split' ne prend pas en charge sp_index")
+            shortest_paths = None
+            tournees = self._route_first_split(G, required_edges)
+        else:
+            shortest_paths = self._shortest_paths(G, required_edges)
+            depot_row = shortest_paths[self.depot_node]
+            required_edges = self._exclude_unservable(
+                G, required_edges, depot_row,
+                {n: shortest_paths[n].get(self.depot_node, math.inf)
+                 for u, v, _ in required_edges for n in (u, v)},
+            )
+            tournees = self._path_scanning_algorithm(
+                G, required_edges, shortest_paths, strategy
+            )
         
         tournees = self._local_optimization(G, tournees, shortest_paths)
         
@@ -38,6 +66,23 @@ class CARPSolver:
         
         return tournees
     
+    def _shortest_paths(self, G: nx.Graph, required_edges: List[Tuple]):
+        """
+        Table des distances à vide current_node -> extrémité d'arête. Sans index
+        elles sont comptées en arêtes (chaque saut vaut 1 km dans les temps),
+        avec sp_index en km réels (attribut length de l'index) : les heures et
+        km des deux modes ne sont donc pas comparables entre eux.
+        """
+        if self.sp_index is None:
+            if hop_weight(G) is None:
+                return dict(nx.all_pairs_shortest_path_length(G))
+            # graphe contracté : une arête fusionnée compte pour ses `hops` arêtes d'origine
+            return dict(nx.all_pairs_dijkstra_path_length(G, weight=HOPS))
+        self.sp_index.check_graph(G, exact=False)
+        targets = {n for u, v, _ in required_edges for n in (u, v)} | {self.depot_node}
+        # index CH construit sur `length` (m) : distances converties en km
+        return self.sp_index.table(scale=1 / 1000, targets=targets)
+
     def _get_required_edges(self, G: nx.Graph) -> List[Tuple]:
         required = []
         for u, v, data in G.edges(data=True):
@@ -45,6 +90,42 @@ class CARPSolver:
                 required.append((u, v, data))
         return required
     
+    def _round_trip_time(self, G: nx.Graph, edge: Tuple, from_depot: Dict, to_depot: Dict) -> float:
+        """
+        Durée (h) de la tournée réduite à cette arête : dépôt -> extrémité,
+        service, extrémité -> dépôt, dans le sens le plus favorable (dans le
+        sens de l'arête seulement si G est orienté). math.inf si inaccessible.
+        """
+        u, v, data = edge
+        ends = [(u, v)] if G.is_directed() else [(u, v), (v, u)]
+        deadhead = min(from_depot.get(a, math.inf) + to_depot.get(b, math.inf) for a, b in ends)
+        return (deadhead + data.get('length_m', 1000) / 1000) / self.speed_kmh
+
+    def _exclude_unservable(self, G: nx.Graph, required_edges: List[Tuple],
+                            from_depot: Dict, to_depot: Dict) -> List[Tuple]:
+        """
+        Retire les arêtes qu'aucune tournée ne peut servir (pas de chemin
+        depuis / vers le dépôt, ou aller-retour seul au-delà de capacity_limit)
+        et les ajoute à self.unserved_edges : sans ce filtre, path scanning
+        ouvrirait indéfiniment des tournées vides.
+        """
+        servable, unreachable, too_far = [], [], []
+        for edge in required_edges:
+            trip = self._round_trip_time(G, edge, from_depot, to_depot)
+            if trip == math.inf:
+                unreachable.append(edge)
+            elif trip > self.capacity_limit:
+                too_far.append(edge)
+            else:
+                servable.append(edge)
+        if unreachable:
+            logging.warning(f"{len(unreachable)} arêtes requises sans chemin vers/depuis le dépôt : exclues")
+        if too_far:
+            logging.warning(f"{len(too_far)} arêtes requises dont l'aller-retour depuis le dépôt "
+                            f"dépasse la capacité : exclues")
+        self.unserved_edges.extend(unreachable + too_far)
+        return servable
+
     def _path_scanning_algorithm(self, G: nx.Graph, required_edges: List[Tuple], 
                                 shortest_paths: Dict, strategy: str) -> List[Dict]:
         unvisited_edges = required_edges.copy()
@@ -99,7 +180,8 @@ class CARPSolver:
         for edge in unvisited_edges:
             u, v, data = edge
             dist_to_u = shortest_paths[current_node][u]
-            dist_to_v = shortest_paths[current_node][v]
+            # sens unique : une arête orientée se sert de u vers v
+            dist_to_v = math.inf if G.is_directed() else shortest_paths[current_node][v]
             min_dist = min(dist_to_u, dist_to_v)
             
             demand = data.get('length_m', 1000) / 1000
@@ -129,7 +211,7 @@ class CARPSolver:
         current_node = current_tournee['current_node']
         
         dist_to_u = shortest_paths[current_node][u]
-        dist_to_v = shortest_paths[current_node][v]
+        dist_to_v = math.inf if G.is_directed() else shortest_paths[current_node][v]
         
         if dist_to_u <= dist_to_v:
             travel_cost = dist_to_u / self.speed_kmh
@@ -143,8 +225,194 @@ class CARPSolver:
         
         return travel_cost, service_time, new_node
     
+    def _route_first_split(self, G: nx.Graph, required_edges: List[Tuple]) -> List[Dict]:
+        weight = hop_weight(G)
+        from_depot = hop_lengths(G, [self.depot_node], weight)[0]
+        if G.is_directed():
+            to_depot = hop_lengths(G.reverse(copy=False), [self.depot_node], weight)[0]
+        else:
+            to_depot = from_depot
+
+        kept = {id(e[2]) for e in self._exclude_unservable(G, required_edges, from_depot, to_depot)}
+        servable = [i for i, e in enumerate(required_edges) if id(e[2]) in kept]
+
+        giant_tour = self._build_giant_tour(G, required_edges, servable)
+        return self._split_giant_tour(required_edges, giant_tour, from_depot, to_depot)
+
+    def _build_giant_tour(self, G: nx.Graph, required_edges: List[Tuple],
+                          servable: List[int]) -> List[Tuple]:
+        """
+        Tour géant sur les arêtes requises : circuit eulérien de chaque
+        composante du sous-graphe requis, rendue paire en doublant des arêtes
+        d'un arbre BFS (T-join sur l'arbre, linéaire, au lieu d'un couplage
+        parfait de poids minimum), en passant à chaque fois à la composante la
+        plus proche. Chaque élément est (indice, début, fin, sauts à vide
+        depuis l'élément précédent). Graphe orienté : _chain_directed_tour.
+        """
+        weight = hop_weight(G)
+        if G.is_directed():
+            return self._chain_directed_tour(G, required_edges, servable, weight)
+
+        R = nx.MultiGraph()
+        for i in servable:
+            u, v, _ = required_edges[i]
+            R.add_edge(u, v, weight=1, req=i)
+
+        components = list(nx.connected_components(R))
+        comp_of = {n: c for c, comp in enumerate(components) for n in comp}
+        remaining = set(range(len(components)))
+
+        giant_tour = []
+        current = self.depot_node
+        while remaining:
+            start, hops = self._nearest_component_node(G, current, comp_of, remaining, weight)
+            if start is None:
+                start, hops = next(iter(components[min(remaining)])), math.inf
+            remaining.discard(comp_of[start])
+            G_aug = nx.MultiGraph(R.subgraph(components[comp_of[start]]))
+            G_aug.add_edges_from(self._tree_t_join(G_aug, start), weight=1)
+
+            for a, b, k in nx.eulerian_circuit(G_aug, source=start, keys=True):
+                data = G_aug[a][b][k]
+                if 'req' in data:
+                    giant_tour.append((data['req'], a, b, hops))
+                    hops = 0
+                else:
+                    hops += data['weight']
+            current = giant_tour[-1][2]
+
+        return giant_tour
+
+    def _chain_directed_tour(self, G: nx.Graph, required_edges: List[Tuple],
+                             servable: List[int], weight: Optional[str]) -> List[Tuple]:
+        """
+        Tour géant sur graphe orienté (Hierholzer glouton) : depuis le nœud
+        courant, on suit une arête requise sortante non servie, sinon on
+        rejoint par recherche locale le nœud le plus proche qui en a une.
+        Les arêtes sont servies dans leur sens, les sauts comptés dans G.
+        """
+        out_edges = {}
+        for i in servable:
+            out_edges.setdefault(required_edges[i][0], []).append(i)
+
+        giant_tour = []
+        current, hops = self.depot_node, 0
+        for _ in range(len(servable)):
+            if current not in out_edges:
+                found = []
+
+                def has_out_edge(node):
+                    if node in out_edges:
+                        found.append(node)
+                        return True
+                    return False
+
+                dist, _ = hop_lengths(G, [current], weight, stop=has_out_edge)
+                current, hops = (found[0], dist[found[0]]) if found else (next(iter(out_edges)), math.inf)
+
+            i = out_edges[current].pop()
+            if not out_edges[current]:
+                del out_edges[current]
+            u, v, _ = required_edges[i]
+            giant_tour.append((i, u, v, hops))
+            current, hops = v, 0
+
+        return giant_tour
+
+    @staticmethod
+    def _tree_t_join(R: nx.MultiGraph, root: int) -> List[Tuple[int, int]]:
+        """
+        Arêtes d'un arbre BFS de R à doubler pour que tous les degrés soient
+        pairs : une arête (parent, n) est doublée si le sous-arbre de n contient
+        un nombre impair de sommets de degré impair.
+        """
+        order = [root]
+        parent = {}
+        for a, b in nx.bfs_edges(R, root):
+            parent[b] = a
+            order.append(b)
+
+        odd = {n: R.degree(n) % 2 == 1 for n in order}
+        duplicated = []
+        for n in reversed(order[1:]):
+            if odd[n]:
+                duplicated.append((parent[n], n))
+                odd[parent[n]] = not odd[parent[n]]
+        return duplicated
+
+    def _nearest_component_node(self, G: nx.Graph, source: int, comp_of: Dict,
+                                remaining: set, weight: Optional[str]) -> Tuple[Optional[int], float]:
+        found = []
+
+        def in_remaining(node):
+            if comp_of.get(node) in remaining:
+                found.append(node)
+                return True
+            return False
+
+        dist, _ = hop_lengths(G, [source], weight, stop=in_remaining)
+        return (found[0], dist[found[0]]) if found else (None, math.inf)
+
+    def _split_giant_tour(self, required_edges: List[Tuple], giant_tour: List[Tuple],
+                          from_depot: Dict, to_depot: Dict) -> List[Dict]:
+        """
+        Découpage optimal du tour géant (Bellman sur le DAG auxiliaire) en
+        tournées de durée <= capacity_limit. La boucle interne s'arrête dès que
+        la charge dépasse la capacité : O(n * b) avec b le nombre maximal
+        d'arêtes par tournée, ~capacity_limit * speed_kmh / longueur moyenne
+        d'arête. Linéaire en n, mais c'est la capacité qui fixe le coût :
+        arêtes de 1 km, 10 km/h et 30 h donnent b = 300, soit 30M itérations
+        et ~10 s pour 100k arêtes.
+        Chaque arête tient seule dans une tournée (filtrée par
+        _route_first_split), ce qui garantit un découpage réalisable.
+        """
+        n = len(giant_tour)
+        speed = self.speed_kmh
+
+        service = [required_edges[idx][2].get('length_m', 1000) / 1000 / self.speed_kmh
+                   for idx, _, _, _ in giant_tour]
+        best = [0.0] + [math.inf] * n
+        pred = [0] * (n + 1)
+        route_time = [0.0] * (n + 1)
+
+        for i in range(n):
+            if best[i] == math.inf:
+                continue
+            access = from_depot.get(giant_tour[i][1], math.inf) / speed
+            load = 0.0
+            for j in range(i, n):
+                if j > i:
+                    load += giant_tour[j][3] / speed
+                load += service[j]
+                if load > self.capacity_limit:
+                    break
+                cost = access + load + to_depot.get(giant_tour[j][2], math.inf) / speed
+                if cost > self.capacity_limit:
+                    continue
+                if best[i] + cost < best[j + 1]:
+                    best[j + 1] = best[i] + cost
+                    pred[j + 1] = i
+                    route_time[j + 1] = cost
+
+        bounds = []
+        j = n
+        while j > 0:
+            bounds.append((pred[j], j))
+            j = pred[j]
+
+        tournees = []
+        for i, j in reversed(bounds):
+            tournees.append({
+                'edges': [required_edges[idx] for idx, _, _, _ in giant_tour[i:j]],
+                'current_node': self.depot_node,
+                'total_distance': route_time[j] * self.speed_kmh,
+                'total_time': route_time[j],
+                'load': sum(service[i:j])
+            })
+        return tournees
+
     def _local_optimization(self, G: nx.Graph, tournees: List[Dict], 
-                          shortest_paths: Dict) -> List[Dict]:
+                          shortest_paths: Optional[Dict]) -> List[Dict]:
         improved = True
         iterations = 0
         max_iterations = 100
@@ -192,15 +460,225 @@ class CARPSolver:
                 final_tournee['efficiency'] = round(service_km / tournee['total_time'], 2)
             
             final_tournees.append(final_tournee)
-        
+
         return final_tournees
 
+    def compute_tournees_multi_depot(self, G: nx.Graph, depots: Sequence[int],
+                                     strategy: str = "mixed", workers: Optional[int] = None,
+                                     rebalance: bool = True) -> List[Dict]:
+        """
+        Planifie les tournées depuis plusieurs dépôts : les arêtes requises sont
+        réparties en cellules de Voronoï réseau (BFS multi-source), puis chaque
+        cellule est résolue comme un sous-problème indépendant, en parallèle.
+        Les arêtes requises qu'aucun dépôt ne peut desservir (aller et retour,
+        dans la limite de capacity_limit) sont exclues des tournées et listées
+        dans self.unserved_edges.
+        """
+        start_time = time.time()
+        self.unserved_edges = []
+
+        for depot in depots:
+            if depot not in G:
+                raise ValueError(f"Dépôt {depot} absent du graphe")
+
+        required_edges = self._get_required_edges(G)
+        if not required_edges:
+            logging.warning("Aucune arête requise trouvée dans le graphe")
+            return []
+
+        owner, dist = self._voronoi_cells(G, depots)
+        trees = self._depot_trees(G, depots)
+        costs = self._depot_costs(G, required_edges, trees)
+        cells, unserved = self._assign_edges_to_depots(G, required_edges, depots, owner, dist, costs)
+        self.unserved_edges = [required_edges[i] for i in unserved]
+        if rebalance:
+            cells = self._rebalance_cells(G, required_edges, cells, owner, costs)
+
+        jobs = []
+        for depot, edge_ids in cells.items():
+            if edge_ids:
+                H = self._build_cell_graph(G, required_edges, edge_ids, depot, owner, trees[depot])
+                jobs.append((self.capacity_limit, self.speed_kmh, depot, H, strategy, self.sp_index))
+
+        logging.info(f"Décomposition en {len(jobs)} sous-problèmes ({len(required_edges)} arêtes requises)")
+
+        if len(jobs) <= 1 or workers == 1:
+            results = [_solve_depot_cell(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_solve_depot_cell, jobs))
+
+        tournees = []
+        for depot, cell_tournees, cell_unserved in results:
+            self.unserved_edges.extend(required_edges[i] for i in cell_unserved)
+            for tournee in cell_tournees:
+                tournee['edges'] = [required_edges[e[2]['_req_idx']] for e in tournee['edges']]
+                tournee['id'] = len(tournees) + 1
+                tournee['depot'] = depot
+                tournees.append(tournee)
+
+        total_time = time.time() - start_time
+        logging.info(f"Multi-dépôts terminé en {total_time:.2f}s - {len(tournees)} tournées créées")
+
+        return tournees
+
+    def _voronoi_cells(self, G: nx.Graph, depots: Sequence[int]) -> Tuple[Dict, Dict]:
+        dist, owner = hop_lengths(G, depots, hop_weight(G))
+        return owner, dist
+
+    def _depot_trees(self, G: nx.Graph, depots: Sequence[int]) -> Dict[int, Tuple[Dict, Dict]]:
+        """
+        Arbres BFS de chaque dépôt : aller (nœud -> prédécesseur depuis le dépôt)
+        et retour (nœud -> successeur vers le dépôt). Identiques si G est non orienté.
+        """
+        R = G.reverse(copy=False) if G.is_directed() else None
+        trees = {}
+        for d in depots:
+            out_tree = {d: None, **dict(nx.bfs_predecessors(G, d))}
+            in_tree = out_tree if R is None else {d: None, **dict(nx.bfs_predecessors(R, d))}
+            trees[d] = (out_tree, in_tree)
+        return trees
+
+    def _depot_costs(self, G: nx.Graph, required_edges: List[Tuple],
+                     trees: Dict[int, Tuple[Dict, Dict]]) -> Dict[int, Tuple[Dict, Dict]]:
+        """
+        Distances à vide dépôt -> nœud et nœud -> dépôt de chaque dépôt, dans
+        la métrique du solveur de cellule : sauts le long des arbres BFS (des
+        chemins présents dans la cellule, donc des majorants de ses distances),
+        ou km de sp_index.
+        """
+        costs = {}
+        ends = {n for u, v, _ in required_edges for n in (u, v)}
+        for d, (out_tree, in_tree) in trees.items():
+            if self.sp_index is not None:
+                to_depot = self.sp_index.table(scale=1 / 1000, targets=[d])
+                costs[d] = ({n: x / 1000 for n, x in self.sp_index.distances(d, ends).items()},
+                            {n: to_depot[n][d] for n in ends})
+                continue
+            # les arbres sont dans l'ordre du BFS : le parent d'un nœud est déjà calculé
+            from_depot = {d: 0}
+            for n, p in out_tree.items():
+                if p is not None:
+                    from_depot[n] = from_depot[p] + edge_hops(G, p, n)
+            to_depot = from_depot
+            if in_tree is not out_tree:
+                to_depot = {d: 0}
+                for n, p in in_tree.items():
+                    if p is not None:
+                        to_depot[n] = to_depot[p] + edge_hops(G, n, p)
+            costs[d] = (from_depot, to_depot)
+        return costs
+
+    def _can_serve(self, G: nx.Graph, costs: Tuple[Dict, Dict], edge: Tuple) -> bool:
+        return self._round_trip_time(G, edge, *costs) <= self.capacity_limit
+
+    def _assign_edges_to_depots(self, G: nx.Graph, required_edges: List[Tuple], depots: Sequence[int],
+                                owner: Dict, dist: Dict,
+                                costs: Dict[int, Tuple[Dict, Dict]]) -> Tuple[Dict[int, List[int]], List[int]]:
+        """
+        Rattache chaque arête requise au dépôt de l'extrémité la plus proche,
+        parmi les dépôts qui peuvent l'atteindre et en revenir dans la limite
+        de capacity_limit (aller-retour réduit à cette seule arête).
+        """
+        cells = {d: [] for d in depots}
+        unserved = []
+
+        for i, edge in enumerate(required_edges):
+            u, v, _ = edge
+            servers = [d for d in depots if self._can_serve(G, costs[d], edge)]
+            if not servers:
+                unserved.append(i)
+                continue
+            ends = [n for n in (u, v) if n in owner and owner[n] in servers]
+            depot = owner[min(ends, key=lambda n: dist[n])] if ends else servers[0]
+            cells[depot].append(i)
+
+        if unserved:
+            logging.warning(f"{len(unserved)} arêtes requises hors de portée des dépôts "
+                            f"(inaccessibles ou aller-retour au-delà de la capacité) : exclues")
+        return cells, unserved
+
+    def _rebalance_cells(self, G: nx.Graph, required_edges: List[Tuple], cells: Dict[int, List[int]],
+                         owner: Dict, costs: Dict[int, Tuple[Dict, Dict]],
+                         max_passes: int = 10) -> Dict[int, List[int]]:
+        assignment = {i: d for d, edge_ids in cells.items() for i in edge_ids}
+        load = {d: 0.0 for d in cells}
+        border = []
+
+        for i, d in assignment.items():
+            u, v, data = required_edges[i]
+            load[d] += data.get('length_m', 1000) / 1000 / self.speed_kmh
+            candidates = {owner[n] for n in (u, v)
+                          if n in owner and self._can_serve(G, costs[owner[n]], required_edges[i])}
+            if len(candidates) > 1:
+                border.append((i, candidates))
+
+        moves = 0
+        for _ in range(max_passes):
+            moved = False
+            for i, candidates in border:
+                current = assignment[i]
+                target = min(candidates, key=lambda d: load[d])
+                service_time = required_edges[i][2].get('length_m', 1000) / 1000 / self.speed_kmh
+                if load[current] - load[target] > service_time:
+                    load[current] -= service_time
+                    load[target] += service_time
+                    assignment[i] = target
+                    moved = True
+                    moves += 1
+            if not moved:
+                break
+
+        logging.info(f"Rééquilibrage : {moves} arêtes frontières déplacées")
+        rebalanced = {d: [] for d in cells}
+        for i, d in sorted(assignment.items()):
+            rebalanced[d].append(i)
+        return rebalanced
+
+    def _build_cell_graph(self, G: nx.Graph, required_edges: List[Tuple], edge_ids: List[int],
+                          depot: int, owner: Dict, tree: Tuple[Dict, Dict]) -> nx.Graph:
+        nodes = {n for n, d in owner.items() if d == depot}
+        # sur un graphe orienté la cellule seule ne garantit ni l'accès aux arêtes
+        # ni le retour : on ajoute les chemins dépôt -> extrémité -> dépôt des arbres BFS
+        for parents in {id(t): t for t in tree}.values():
+            on_path = {depot}
+            for i in edge_ids:
+                for n in required_edges[i][:2]:
+                    while n not in on_path:
+                        on_path.add(n)
+                        n = parents[n]
+            nodes |= on_path
+
+        req_index = {id(required_edges[i][2]): i for i in edge_ids}
+        H = G.__class__()
+        H.add_nodes_from(nodes)
+        for u, v, data in G.subgraph(nodes).edges(data=True):
+            attrs = dict(data)
+            attrs['required'] = id(data) in req_index
+            if attrs['required']:
+                attrs['_req_idx'] = req_index[id(data)]
+            H.add_edge(u, v, **attrs)
+        return H
+
+
+def _solve_depot_cell(job: Tuple) -> Tuple[int, List[Dict], List[int]]:
+    capacity_limit, speed_kmh, depot, H, strategy, sp_index = job
+    solver = CARPSolver(capacity_limit, speed_kmh, depot_node=depot, sp_index=sp_index)
+    tournees = solver.compute_tournees(H, strategy)
+    return depot, tournees, [e[2]['_req_idx'] for e in solver.unserved_edges]
+
 
 def compute_tournees(G: nx.Graph, strategy: str = "mixed") -> List[Dict]:
     solver = CARPSolver()
     return solver.compute_tournees(G, strategy)
 
 
+def compute_tournees_multi_depot(G: nx.Graph, depots: Sequence[int], strategy: str = "mixed",
+                                 workers: Optional[int] = None) -> List[Dict]:
+    solver = CARPSolver()
+    return solver.compute_tournees_multi_depot(G, depots, strategy, workers)
+
+
 def analyze_solution_quality(tournees: List[Dict]) -> Dict:
     if not tournees:
         return {'error': 'Aucune tournée générée'}
@@ -223,7 +701,7 @@ def analyze_solution_quality(tournees: List[Dict]) -> Dict:
     }
 
 def benchmark_strategies(G: nx.Graph) -> Dict:
-    strategies = ["nearest", "cheapest", "mixed"]
+    strategies = ["nearest", "cheapest", "mixed", "split"]
     results = {}
     
     for strategy in strategies:
@@ -234,6 +712,10 @@ def benchmark_strategies(G: nx.Graph) -> Dict:
         
         analysis = analyze_solution_quality(tournees)
         analysis['execution_time'] = round(exec_time, 3)
+        analysis['valid'] = validate_tournees(
+            G, tournees, solver.capacity_limit, solver.speed_kmh, solver.depot_node,
+            sp_index=solver.sp_index
+        )['valid']
         results[strategy] = analysis
     
     return results
@@ -282,3 +764,4 @@ if __name__ == '__main__':
         print(f"  Routes: {results['num_routes']}, Temps: {results['execution_time']}s")
         print(f"  Distance totale: {results['total_distance_km']} km")
         print(f"  Efficacité: {results['efficiency_score']} km/h")
+        print(f"  Solution valide: {results['valid']}")
@@ -0,0 +1,152 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import networkx as nx
+import numpy as np
+
+try:
+    from .validation import index_edges
+except ImportError:
+    from validation import index_edges
+
+ROUTE_METRICS = ("km", "hours", "utilization", "efficiency")
+
+
+class ColumnarSolutions:
+    """
+    Lot de solutions CARP sous forme de colonnes numpy :
+      - edge_index : indices des arêtes servies (ordre de G.edges), toutes
+        tournées de toutes les solutions bout à bout
+      - route_offsets : tournée r = edge_index[route_offsets[r]:route_offsets[r + 1]]
+      - solution_offsets : solution s = tournées solution_offsets[s]:solution_offsets[s + 1]
+      - km, hours, utilization, efficiency : une valeur par tournée
+      - depot : nœud de départ de chaque tournée (compute_tournees_multi_depot),
+        -1 si la tournée n'en précise pas
+    Le lot se sérialise en quelques tableaux contigus (pickle ou .npz).
+    """
+
+    def __init__(self, edge_index: np.ndarray, route_offsets: np.ndarray,
+                 solution_offsets: np.ndarray, depot: Optional[np.ndarray] = None,
+                 **metrics: np.ndarray):
+        self.edge_index = edge_index
+        self.route_offsets = route_offsets
+        self.solution_offsets = solution_offsets
+        self.depot = np.full(len(route_offsets) - 1, -1, dtype=np.int64) if depot is None else depot
+        for name in ROUTE_METRICS:
+            setattr(self, name, metrics[name])
+
+    @classmethod
+    def from_tournees(cls, solutions: Sequence[List[Dict]], G: Optional[nx.Graph] = None,
+                      index: Optional[Dict] = None) -> "ColumnarSolutions":
+        if index is None:
+            index = index_edges(G)
+        edge_ids = index['edge_ids']
+        routes = [t for tournees in solutions for t in tournees]
+
+        route_counts = np.fromiter((len(t['edges']) for t in routes), dtype=np.int64, count=len(routes))
+        route_offsets = np.concatenate(([0], np.cumsum(route_counts)))
+        solution_offsets = np.concatenate(([0], np.cumsum([len(s) for s in solutions]))).astype(np.int64)
+        edge_index = np.fromiter((edge_ids[id(e[2])] for t in routes for e in t['edges']),
+                                 dtype=np.int32, count=int(route_offsets[-1]))
+        metrics = {
+            name: np.fromiter((t[name] for t in routes), dtype=np.float64, count=len(routes))
+            for name in ROUTE_METRICS
+        }
+        depot = np.fromiter((t.get('depot', -1) for t in routes), dtype=np.int64, count=len(routes))
+        return cls(edge_index, route_offsets, solution_offsets, depot, **metrics)
+
+    @classmethod
+    def concat(cls, batches: Sequence["ColumnarSolutions"]) -> "ColumnarSolutions":
+        """Fusionne des lots (par ex. renvoyés par plusieurs processus)."""
+        edge_shift = np.cumsum([0] + [len(b.edge_index) for b in batches[:-1]])
+        route_shift = np.cumsum([0] + [b.num_routes for b in batches[:-1]])
+        return cls(
+            np.concatenate([b.edge_index for b in batches]),
+            np.concatenate([[0]] + [b.route_offsets[1:] + s for b, s in zip(batches, edge_shift)]),
+            np.concatenate([[0]] + [b.solution_offsets[1:] + s for b, s in zip(batches, route_shift)]),
+            np.concatenate([b.depot for b in batches]),
+            **{name: np.concatenate([getattr(b, name) for b in batches]) for name in ROUTE_METRICS},
+        )
+
+    @property
+    def num_solutions(self) -> int:
+        return len(self.solution_offsets) - 1
+
+    @property
+    def num_routes(self) -> int:
+        return len(self.route_offsets) - 1
+
+    def routes_per_solution(self) -> np.ndarray:
+        return np.diff(self.solution_offsets)
+
+    def service_km(self, length_km: np.ndarray) -> np.ndarray:
+        """Kilomètres de service par tournée, recalculés depuis index_edges(G)['length_km']."""
+        per_edge = np.concatenate(([0.0], np.cumsum(length_km[self.edge_index])))
+        return per_edge[self.route_offsets[1:]] - per_edge[self.route_offsets[:-1]]
+
+    def to_tournees(self, G: nx.Graph, s: int) -> List[Dict]:
+        """La fonction reconstruit la solution s au format de compute_tournees."""
+        edges = list(G.edges(data=True))
+        tournees = []
+        for k, r in enumerate(range(self.solution_offsets[s], self.solution_offsets[s + 1])):
+            route_edges = [edges[i] for i in self.edge_index[self.route_offsets[r]:self.route_offsets[r + 1]]]
+            tournee = {'id': k + 1, 'edges': route_edges, 'num_edges': len(route_edges)}
+            tournee.update({name: float(getattr(self, name)[r]) for name in ROUTE_METRICS})
+            if self.depot[r] >= 0:
+                tournee['depot'] = int(self.depot[r])
+            tournees.append(tournee)
+        return tournees
+
+    def save(self, path: Path) -> None:
+        np.savez(path, edge_index=self.edge_index, route_offsets=self.route_offsets,
+                 solution_offsets=self.solution_offsets, depot=self.depot,
+                 **{name: getattr(self, name) for name in ROUTE_METRICS})
+
+    @classmethod
+    def load(cls, path: Path) -> "ColumnarSolutions":
+        with np.load(path) as z:
+            # lots enregistrés avant la colonne depot : -1 partout
+            return cls(z['edge_index'], z['route_offsets'], z['solution_offsets'],
+                       z['depot'] if 'depot' in z else None,
+                       **{name: z[name] for name in ROUTE_METRICS})
+
+
+def _round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    # round() Python plutôt que np.round, pour des valeurs identiques à analyze_solution_quality
+    return np.array([round(v, ndigits) for v in values.tolist()], dtype=np.float64)
+
+
+def analyze_batch(batch: ColumnarSolutions) -> Dict[str, np.ndarray]:
+    """
+    Équivalent vectorisé de analyze_solution_quality pour toutes les solutions
+    du lot : un tableau par indicateur, NaN pour les solutions sans tournée.
+    """
+    counts = batch.routes_per_solution()
+    non_empty = counts > 0
+    starts = batch.solution_offsets[:-1][non_empty]
+
+    def per_solution(values: np.ndarray, ufunc: np.ufunc) -> np.ndarray:
+        out = np.full(batch.num_solutions, np.nan)
+        if starts.size:
+            out[non_empty] = ufunc.reduceat(values, starts)
+        return out
+
+    total_km = per_solution(batch.km, np.add)
+    total_hours = per_solution(batch.hours, np.add)
+    max_time = per_solution(batch.hours, np.maximum)
+    min_time = per_solution(batch.hours, np.minimum)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_utilization = per_solution(batch.utilization, np.add) / counts
+        efficiency = np.where(total_hours > 0, total_km / total_hours, 0.0)
+    efficiency[~non_empty] = np.nan
+
+    return {
+        'num_routes': counts,
+        'total_distance_km': _round(total_km, 2),
+        'total_time_hours': _round(total_hours, 2),
+        'avg_utilization_percent': _round(avg_utilization, 1),
+        'max_route_time': _round(max_time, 2),
+        'min_route_time': _round(min_time, 2),
+        'time_balance': _round(max_time - min_time, 2),
+        'efficiency_score': _round(efficiency, 2),
+    }
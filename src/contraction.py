@@ -0,0 +1,221 @@
+import heapq
+import itertools
+import logging
+import math
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import networkx as nx
+
+WEIGHT_ATTRS = ("length", "length_m")
+HOPS = "hops"
+
+
+def _incident(H: nx.Graph, n) -> List[Tuple]:
+    if H.is_directed():
+        return list(H.in_edges(n, data=True)) + list(H.out_edges(n, data=True))
+    return list(H.edges(n, data=True))
+
+
+def _neighbors(H: nx.Graph, n) -> Set:
+    nbrs = set(H.predecessors(n)) | set(H.successors(n)) if H.is_directed() else set(H.neighbors(n))
+    nbrs.discard(n)
+    return nbrs
+
+
+def _oriented_path(data: Dict, x, y) -> Tuple:
+    path = data.get("osm_path", (x, y))
+    return tuple(path) if path[0] == x else tuple(reversed(path))
+
+
+def _merge(first: Dict, second: Dict, x, n, y) -> Dict:
+    attrs = {"required": False, HOPS: first.get(HOPS, 1) + second.get(HOPS, 1)}
+    for name in WEIGHT_ATTRS:
+        if name in first or name in second:
+            attrs[name] = first.get(name, 0.0) + second.get(name, 0.0)
+    attrs["osm_path"] = _oriented_path(first, x, n) + _oriented_path(second, n, y)[1:]
+    return attrs
+
+
+def _prune_dead_ends(H: nx.Graph, keep: Set) -> int:
+    queue = deque(H.nodes())
+    removed = 0
+    while queue:
+        n = queue.popleft()
+        if n in keep or n not in H:
+            continue
+        nbrs = _neighbors(H, n)
+        if len(nbrs) > 1 or any(d.get("required", False) for _, _, d in _incident(H, n)):
+            continue
+        H.remove_node(n)
+        removed += 1
+        queue.extend(nbrs)
+    return removed
+
+
+def _chain_links(H: nx.Graph, n, a, b) -> List[Tuple]:
+    """Renvoie les paires d'arêtes (x -> n, n -> y) à fusionner, ou [] si n n'est pas contractable."""
+    incident = _incident(H, n)
+    if H.is_directed():
+        pairs = [(u, v) for u, v, _ in incident]
+        if len(pairs) != len(set(pairs)):
+            return []
+        links = []
+        for x, y in ((a, b), (b, a)):
+            has_in, has_out = (x, n) in pairs, (n, y) in pairs
+            if has_in != has_out:
+                return []
+            if has_in:
+                links.append((x, y, H[x][n], H[n][y]))
+        if 2 * len(links) != len(pairs):
+            return []
+    else:
+        if len(incident) != 2:
+            return []
+        links = [(a, b, H[a][n], H[n][b])]
+
+    if H.is_multigraph():
+        links = [(x, y, next(iter(d1.values())), next(iter(d2.values()))) for x, y, d1, d2 in links]
+    elif any(H.has_edge(x, y) for x, y, _, _ in links):
+        return []
+    return links
+
+
+def _share_required_data(H: nx.Graph, G: nx.Graph) -> None:
+    """
+    Remplace, dans la copie H, le dictionnaire d'attributs de chaque arête
+    requise par celui de G : ces arêtes ne sont jamais fusionnées, et les
+    tournées calculées sur H désignent ainsi les arêtes de G (identité
+    id(data) de validate_tournees et ColumnarSolutions). networkx partage
+    un même objet entre les deux sens d'adjacence, d'où la seule affectation.
+    """
+    if G.is_multigraph():
+        for u, v, k, data in G.edges(keys=True, data=True):
+            if data.get("required", False):
+                H._adj[u][v][k] = data
+        return
+    pred = H._pred if H.is_directed() else H._adj
+    for u, v, data in G.edges(data=True):
+        if data.get("required", False):
+            H._adj[u][v] = data
+            pred[v][u] = data
+
+
+def contract_deadhead_chains(G: nx.Graph, keep: Iterable = ()) -> nx.Graph:
+    """
+    Renvoie une copie de G réduite au réseau utile au routage :
+      - les sous-arbres en cul-de-sac sans arête requise sont supprimés
+      - les chaînes de nœuds de degré 2 dont les arêtes ne sont pas requises
+        deviennent une seule arête (length / length_m sommées)
+    Les nœuds de `keep` (dépôts) sont conservés. Chaque arête fusionnée porte
+    osm_path, la séquence de nœuds d'origine (voir expand_node_path), et
+    hops, le nombre d'arêtes d'origine : le solveur, qui compte la distance
+    à vide en arêtes, obtient ainsi les mêmes coûts sur H que sur G. Les
+    arêtes requises partagent leurs attributs avec G : une solution calculée
+    sur H se valide directement sur G.
+    """
+    H = G.copy()
+    _share_required_data(H, G)
+    keep = set(keep)
+    n_nodes, n_edges = H.number_of_nodes(), H.number_of_edges()
+
+    pruned = _prune_dead_ends(H, keep)
+
+    contracted = 0
+    for n in list(H.nodes()):
+        if n in keep or n not in H:
+            continue
+        incident = _incident(H, n)
+        if any(d.get("required", False) for _, _, d in incident):
+            continue
+        nbrs = _neighbors(H, n)
+        if len(nbrs) != 2 or any(u == v for u, v, _ in incident):
+            continue
+        a, b = nbrs
+        links = _chain_links(H, n, a, b)
+        if not links:
+            continue
+        merged = [(x, y, _merge(d1, d2, x, n, y)) for x, y, d1, d2 in links]
+        H.remove_node(n)
+        for x, y, attrs in merged:
+            H.add_edge(x, y, **attrs)
+        contracted += 1
+
+    logging.info(
+        f"Contraction : {n_nodes} -> {H.number_of_nodes()} nœuds, {n_edges} -> {H.number_of_edges()} arêtes "
+        f"({pruned} culs-de-sac supprimés, {contracted} nœuds de chaîne contractés)"
+    )
+    return H
+
+
+def expand_node_path(H: nx.Graph, nodes: List) -> List:
+    """La fonction ré-développe une séquence de nœuds de H en nœuds du graphe d'origine."""
+    if not nodes:
+        return []
+    expanded = [nodes[0]]
+    for x, y in zip(nodes[:-1], nodes[1:]):
+        data = H[x][y]
+        if H.is_multigraph():
+            data = min(data.values(), key=lambda d: d.get("length", d.get("length_m", 0.0)))
+        expanded.extend(_oriented_path(data, x, y)[1:])
+    return expanded
+
+
+def hop_weight(G: nx.Graph) -> Optional[str]:
+    """La fonction renvoie HOPS si G contient des arêtes fusionnées, None sinon (BFS non pondéré)."""
+    return HOPS if any(HOPS in d for _, _, d in G.edges(data=True)) else None
+
+
+def edge_hops(G: nx.Graph, u, v) -> int:
+    """Nombre d'arêtes d'origine de u à v (la plus courte des arêtes parallèles)."""
+    data = G[u][v]
+    if G.is_multigraph():
+        return min(d.get(HOPS, 1) for d in data.values())
+    return data.get(HOPS, 1)
+
+
+def hop_lengths(G: nx.Graph, sources: Iterable, weight: Optional[str] = None,
+                stop: Optional[Callable] = None) -> Tuple[Dict, Dict]:
+    """
+    Distances en arêtes d'origine depuis les nœuds de sources (BFS, ou
+    Dijkstra sur hops si weight == HOPS). Renvoie (dist, owner), owner étant
+    la source la plus proche. Si stop est donné, la recherche s'arrête au
+    premier nœud de distance définitive pour lequel stop(nœud) est vrai.
+    """
+    sources = list(sources)
+    dist = {s: 0 for s in sources}
+    owner = {s: s for s in sources}
+
+    if weight is None:
+        if stop is not None and any(stop(s) for s in sources):
+            return dist, owner
+        queue = deque(sources)
+        while queue:
+            node = queue.popleft()
+            for nbr in G.neighbors(node):
+                if nbr not in dist:
+                    dist[nbr] = dist[node] + 1
+                    owner[nbr] = owner[node]
+                    if stop is not None and stop(nbr):
+                        return dist, owner
+                    queue.append(nbr)
+        return dist, owner
+
+    settled = {}
+    order = itertools.count()
+    heap = [(0, next(order), s) for s in sources]
+    heapq.heapify(heap)
+    while heap:
+        d, _, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled[node] = d
+        if stop is not None and stop(node):
+            break
+        for nbr in G.neighbors(node):
+            nd = d + edge_hops(G, node, nbr)
+            if nd < dist.get(nbr, math.inf):
+                dist[nbr] = nd
+                owner[nbr] = owner[node]
+                heapq.heappush(heap, (nd, next(order), nbr))
+    return settled, {n: owner[n] for n in settled}
@@ -5,6 +5,18 @@ import networkx as nx
 import pickle
 from shapely.geometry import box  
 
+try:
+    from ..ch_index import ShortestPathIndex, index_path
+    from .slim import save_slim_graph
+except ImportError:
+    # exécution directe (python src/data/prepare_data.py, %run du notebook 01)
+    import sys
+    SRC_DIR = Path(__file__).resolve().parent.parent
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+    from ch_index import ShortestPathIndex, index_path
+    from data.slim import save_slim_graph
+
 RAW_DIR = Path("data/raw")
 PROC_DIR = Path("data/processed")
 
@@ -42,9 +54,19 @@ def download_and_save_full_graph() -> nx.MultiDiGraph:
     with open(PROC_DIR / "graph_full.pkl", "wb") as f:
         pickle.dump(G, f)
     print("Graphe complet sérialisé data/processed/graph_full.pkl")
+    save_slim_graph(G, PROC_DIR / "graph_full.pkl")
+    print("Graphe solveur allégé data/processed/graph_full.slim.npz")
     return G
 
 
+def build_shortest_path_indexes(G: nx.MultiDiGraph) -> None:
+    """La fonction construit et sauvegarde les index CH (orienté et non orienté) du graphe complet."""
+    for directed in (True, False):
+        out = index_path(PROC_DIR / "graph_full.pkl", directed)
+        print(f"▶ Index plus courts chemins ({'orienté' if directed else 'non orienté'}) → {out}")
+        ShortestPathIndex.build(G, weight="length", directed=directed).save(out)
+
+
 def extract_sector_graphs(_: nx.MultiDiGraph) -> None:
     """Construit, sérialise et exporte les graphes des 5 secteurs."""
     print("🔎  Extraction des 5 sous-graphes sectoriels…")
@@ -52,8 +74,10 @@ def extract_sector_graphs(_: nx.MultiDiGraph) -> None:
         print(f"  • {name}")
         poly = box(bb["west"], bb["south"], bb["east"], bb["north"])
         G_sub = ox.graph_from_polygon(poly, network_type="drive")
-        with open(PROC_DIR / f"graph_sector_{name}.pkl", "wb") as f:
+        gpath = PROC_DIR / f"graph_sector_{name}.pkl"
+        with open(gpath, "wb") as f:
             pickle.dump(G_sub, f)
+        save_slim_graph(G_sub, gpath)
         shp_out = RAW_DIR / "sectors" / name
         print(f"    ▶ Export Shapefile dans {shp_out}/")
         save_graph_shapefile(G_sub, shp_out)
@@ -66,4 +90,5 @@ if __name__ == "__main__":
     PROC_DIR.mkdir(parents=True, exist_ok=True)
 
     full_graph = download_and_save_full_graph()
+    build_shortest_path_indexes(full_graph)
     extract_sector_graphs(full_graph)
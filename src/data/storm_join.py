@@ -0,0 +1,131 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+
+
+def edge_geometries(G: nx.MultiDiGraph) -> Tuple[List[Dict], np.ndarray]:
+    """
+    La fonction renvoie les dictionnaires d'attributs des arêtes (dans l'ordre
+    de G.edges) et le tableau de leurs LineString. Les arêtes sans attribut
+    geometry sont reconstruites en segments à partir des x/y des nœuds.
+    """
+    datas = []
+    geoms = np.empty(G.number_of_edges(), dtype=object)
+    missing, ends = [], []
+    for i, (u, v, data) in enumerate(G.edges(data=True)):
+        datas.append(data)
+        if "geometry" in data:
+            geoms[i] = data["geometry"]
+        else:
+            missing.append(i)
+            ends.append(((G.nodes[u]["x"], G.nodes[u]["y"]), (G.nodes[v]["x"], G.nodes[v]["y"])))
+    if missing:
+        geoms[missing] = shapely.linestrings(np.asarray(ends, dtype=np.float64))
+    return datas, geoms
+
+
+def join_storm_layers(
+    G: nx.MultiDiGraph,
+    snow_points: Optional[Sequence] = None,
+    snow_depth_cm: Optional[Sequence[float]] = None,
+    priority_geoms: Optional[Sequence] = None,
+    priority_levels: Optional[Sequence[int]] = None,
+    closed_geoms: Optional[Sequence] = None,
+    max_distance: Optional[float] = None,
+    depth_threshold_cm: float = 2.5,
+    depth_per_pass_cm: float = 10.0,
+) -> Dict:
+    """
+    Jointure spatiale en bloc des couches d'une tempête sur les arêtes de G
+    (mêmes CRS et unités que les x/y du graphe ; accepte des GeoSeries) :
+      - snow_points / snow_depth_cm : relevés ponctuels, chaque arête prend
+        la hauteur du relevé le plus proche à moins de max_distance (unités
+        du graphe, obligatoire), 0 au-delà
+      - priority_geoms / priority_levels : rues prioritaires (lignes ou
+        polygones), une arête prend le niveau maximal qu'elle intersecte
+      - closed_geoms : rues fermées, jamais requises
+    Seuls les attributs des couches fournies (snow_depth_cm, priority,
+    closed) sont remplacés ; les autres sont relus sur les arêtes, ce qui
+    permet d'appliquer les couches en plusieurs appels. required et demand_m
+    (longueur × nombre de passes de depth_per_pass_cm) sont recalculés à
+    partir de snow_depth_cm et priority ; sur un graphe sans ces attributs,
+    le besoin hors fermetures est gardé dans required_base, de sorte que
+    rouvrir une rue (closed_geoms=[]) la rend de nouveau requise.
+    Les arêtes fermées restent dans G : router sur open_roads(G) pour ne
+    pas les emprunter à vide.
+    """
+    datas, lines = edge_geometries(G)
+    m = len(datas)
+    depth = np.array([d.get("snow_depth_cm", 0.0) for d in datas], dtype=np.float64)
+    priority = np.array([d.get("priority", 0) for d in datas], dtype=np.int64)
+    closed = np.array([d.get("closed", False) for d in datas], dtype=bool)
+    updated = {}
+    matched = 0
+
+    if snow_points is not None:
+        if max_distance is None:
+            raise ValueError("max_distance est requis avec snow_points : sans rayon, un relevé "
+                             "lointain fixerait la hauteur de toutes les arêtes")
+        points = np.asarray(snow_points, dtype=object)
+        values = np.asarray(snow_depth_cm, dtype=np.float64)
+        edge_idx, point_idx = STRtree(points).query_nearest(
+            lines, max_distance=max_distance, all_matches=False
+        )
+        depth[:] = 0.0
+        depth[edge_idx] = values[point_idx]
+        matched = len(edge_idx)
+        updated["snow_depth_cm"] = depth
+
+    if priority_geoms is not None or closed_geoms is not None:
+        tree = STRtree(lines)
+        if priority_geoms is not None:
+            geoms = np.asarray(priority_geoms, dtype=object)
+            levels = np.ones(len(geoms), dtype=np.int64) if priority_levels is None \
+                else np.asarray(priority_levels, dtype=np.int64)
+            geom_idx, edge_idx = tree.query(geoms, predicate="intersects")
+            priority[:] = 0
+            np.maximum.at(priority, edge_idx, levels[geom_idx])
+            updated["priority"] = priority
+        if closed_geoms is not None:
+            _, edge_idx = tree.query(np.asarray(closed_geoms, dtype=object), predicate="intersects")
+            closed[:] = False
+            closed[edge_idx] = True
+            updated["closed"] = closed
+
+    length = np.array([d.get("length_m", d.get("length", np.nan)) for d in datas], dtype=np.float64)
+    no_length = np.isnan(length)
+    length[no_length] = shapely.length(lines[no_length])
+
+    if "snow_depth_cm" in updated or "priority" in updated \
+            or any("snow_depth_cm" in d or "priority" in d for d in datas):
+        base = (depth >= depth_threshold_cm) | (priority > 0)
+    else:
+        # pas de couche de tempête : required d'avant la première fermeture
+        base = np.array([d.get("required_base", d.get("required", False)) for d in datas], dtype=bool)
+    required = base & ~closed
+    passes = np.maximum(1.0, np.ceil(depth / depth_per_pass_cm))
+    demand = np.where(required, length * passes, 0.0)
+    updated.update(required_base=base, required=required, demand_m=demand)
+
+    columns = {name: values.tolist() for name, values in updated.items()}
+    for i, data in enumerate(datas):
+        data.update({name: values[i] for name, values in columns.items()})
+
+    return {
+        "num_edges": m,
+        "snow_matched_edges": matched,
+        "priority_edges": int((priority > 0).sum()),
+        "closed_edges": int(closed.sum()),
+        "required_edges": int(required.sum()),
+        "total_demand_km": round(float(demand.sum()) / 1000, 2),
+    }
+
+
+def open_roads(G: nx.MultiDiGraph) -> nx.MultiDiGraph:
+    """La fonction renvoie une vue de G sans les arêtes marquées closed (routage à vide)."""
+    if G.is_multigraph():
+        return nx.subgraph_view(G, filter_edge=lambda u, v, k: not G[u][v][k].get("closed", False))
+    return nx.subgraph_view(G, filter_edge=lambda u, v: not G[u][v].get("closed", False))
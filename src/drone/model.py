@@ -1,9 +1,48 @@
 # src/drone/model.py
+from functools import partial
 from pathlib import Path
 import networkx as nx
 from typing import List, Tuple
 
-def chinese_postman(G: nx.MultiDiGraph, weight: str = "length") -> Tuple[List[Tuple[int, int]], float]:
+def eulerian_augment(G_und: nx.Graph, weight: str = "weight", sp_index=None) -> nx.MultiGraph:
+    """
+    Rend un graphe non orienté connexe eulérien : les sommets de degré impair
+    sont appariés par un couplage de poids minimal et les plus courts chemins
+    correspondants sont dupliqués (attribut added=1 sur les arêtes ajoutées).
+    sp_index : ShortestPathIndex non orienté optionnel, utilisé à la place de
+    Dijkstra ; il doit couvrir G_und et ses chemins rester dans G_und (ValueError sinon).
+    """
+    odds = [v for v, d in G_und.degree() if d % 2 == 1]
+    if sp_index is None:
+        dists = {u: nx.single_source_dijkstra_path_length(G_und, u, weight=weight) for u in odds}
+        shortest_path = partial(nx.shortest_path, G_und, weight=weight)
+    else:
+        if sp_index.directed:
+            raise ValueError("L'index doit être construit sur le graphe non orienté (directed=False)")
+        sp_index.check_graph(G_und, exact=False)
+        dists = sp_index.table(targets=odds)
+        shortest_path = sp_index.path
+    K = nx.Graph()
+    for i, u in enumerate(odds):
+        for v in odds[i + 1:]:
+            K.add_edge(u, v, weight=dists[u][v])
+    matches = nx.algorithms.matching.min_weight_matching(K, weight="weight")
+    G_aug = nx.MultiGraph(G_und)
+    for u, v in matches:
+        path = shortest_path(u, v)
+        if not all(G_und.has_edge(a, b) for a, b in zip(path[:-1], path[1:])):
+            raise ValueError(f"Le chemin {u} -> {v} de l'index sort du graphe : index d'un autre graphe")
+        for a, b in zip(path[:-1], path[1:]):
+            if G_und.is_multigraph():
+                w = min(d.get(weight, 1.0) for d in G_und[a][b].values())
+            else:
+                w = G_und[a][b].get(weight, 1.0)
+            G_aug.add_edge(a, b, **{weight: w}, added=1)
+    return G_aug
+
+
+def chinese_postman(G: nx.MultiDiGraph, weight: str = "length",
+                    sp_index=None) -> Tuple[List[Tuple[int, int]], float]:
     """
     Résout le Chinese Postman sur un graphe routier orienté en
     le traitant d'abord comme non‐orienté (pour le drone).
@@ -12,6 +51,8 @@ def chinese_postman(G: nx.MultiDiGraph, weight: str = "length") -> Tuple[List[Tu
       - total_dist: distance totale parcourue en mètres
     """
     
+    if sp_index is not None:
+        sp_index.check_graph(G)
     G_und = nx.Graph()
     for u, v, data in G.edges(data=True):
         w = data.get(weight, 1.0)
@@ -20,19 +61,7 @@ def chinese_postman(G: nx.MultiDiGraph, weight: str = "length") -> Tuple[List[Tu
                 G_und[u][v]["weight"] = w
         else:
             G_und.add_edge(u, v, weight=w)   
-    odds = [v for v, d in G_und.degree() if d % 2 == 1]
-    dists = dict(nx.all_pairs_dijkstra_path_length(G_und, weight="weight"))
-    K = nx.Graph()
-    for i, u in enumerate(odds):
-        for v in odds[i + 1:]:
-            K.add_edge(u, v, weight=dists[u][v])
-    matches = nx.algorithms.matching.min_weight_matching(K, weight="weight")
-    G_aug = nx.MultiGraph(G_und)         
-    for u, v in matches:
-        path = nx.shortest_path(G_und, u, v, weight="weight")
-        for a, b in zip(path[:-1], path[1:]):
-            w = G_und[a][b]["weight"]
-            G_aug.add_edge(a, b, weight=w, added=1)   
+    G_aug = eulerian_augment(G_und, weight="weight", sp_index=sp_index)
     circuit_edges = list(nx.eulerian_circuit(G_aug)) 
     total_dist = 0.0
     nodes_path = []        
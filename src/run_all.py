@@ -1,25 +1,305 @@
-import networkx as nx
+import argparse
+import glob
+import hashlib
+import json
+import os
 import pickle
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
 from pathlib import Path
-from carp_mvp import compute_tournees, analyze_solution_quality
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import pandas as pd
+
+from carp_mvp import CARPSolver, analyze_solution_quality
+from validation import validate_tournees
+from ch_index import ShortestPathIndex
+from data.slim import load_node_ids, load_slim_graph, slim_paths
+from drone.model import chinese_postman
+
+QUEUE_STATES = ("pending", "running", "done", "failed")
+DEFAULT_LEASE_S = 6 * 3600
+_GRAPH_CACHE: Dict[str, nx.Graph] = {}
+_INDEX_CACHE: Dict[str, ShortestPathIndex] = {}
+_GRAPH_INDEX_CACHE: Dict[Tuple[str, str], Optional[ShortestPathIndex]] = {}
+
+
+def sector_name(graph_path: str) -> str:
+    return Path(graph_path).stem.replace("graph_sector_", "")
+
+
+def build_jobs(graph_paths: List[str], strategies: List[str], capacities: List[float],
+               drone: bool = False, index: Optional[str] = None) -> List[Dict]:
+    """
+    Produit cartésien graphes × stratégies × capacités (+ un job drone par graphe).
+    index : index CH (.ch.npz) utilisé par les jobs véhicule hors "split", qui
+    compte la distance à vide en sauts et ne prend pas d'index (voir CARPSolver).
+    """
+    jobs = [
+        {"graph": str(g), "kind": "vehicle", "strategy": s, "capacity": c}
+        for g, s, c in product(graph_paths, strategies, capacities)
+    ]
+    if index is not None:
+        for job in jobs:
+            if job["strategy"] != "split":
+                job["index"] = str(index)
+    if drone:
+        jobs += [{"graph": str(g), "kind": "drone", "strategy": None, "capacity": None} for g in graph_paths]
+    for job in jobs:
+        job["job_id"] = hashlib.sha1(json.dumps(job, sort_keys=True).encode()).hexdigest()
+    return jobs
+
+
+def load_graph(graph_path: str) -> nx.Graph:
+    if graph_path not in _GRAPH_CACHE:
+        if slim_paths(graph_path)["graph"].exists():
+            _GRAPH_CACHE[graph_path] = load_slim_graph(graph_path)
+        else:
+            with open(graph_path, "rb") as f:
+                _GRAPH_CACHE[graph_path] = pickle.load(f)
+    return _GRAPH_CACHE[graph_path]
+
+
+def load_index(index_file: str, graph_path: str) -> Optional[ShortestPathIndex]:
+    """
+    Charge l'index CH pour le graphe de graph_path. L'index est construit sur
+    les identifiants OSM : pour un graphe allégé (nœuds 0..n-1) il est
+    renuméroté par la table .ids.npy. None si l'index ne couvre pas tous les
+    nœuds du graphe (secteur débordant du graphe complet).
+    """
+    key = (index_file, graph_path)
+    if key not in _GRAPH_INDEX_CACHE:
+        if index_file not in _INDEX_CACHE:
+            _INDEX_CACHE[index_file] = ShortestPathIndex.load(index_file)
+        index = _INDEX_CACHE[index_file]
+        if slim_paths(graph_path)["graph"].exists():
+            index = index.relabel(load_node_ids(graph_path).tolist())
+        _GRAPH_INDEX_CACHE[key] = index if index.covers(load_graph(graph_path), exact=False) else None
+    return _GRAPH_INDEX_CACHE[key]
+
+
+def run_job(job: Dict) -> Dict:
+    G = load_graph(job["graph"])
+    row = {k: job[k] for k in ("job_id", "graph", "kind", "strategy", "capacity")}
+    row.update(sector=sector_name(job["graph"]), host=socket.gethostname(),
+               num_nodes=G.number_of_nodes(), num_edges=G.number_of_edges())
+    start_time = time.time()
+
+    if job["kind"] == "drone":
+        _, dist = chinese_postman(G)
+        row["total_distance_km"] = round(dist / 1000, 2)
+    else:
+        if not any(d.get("required", False) for _, _, d in G.edges(data=True)):
+            for _, _, d in G.edges(data=True):
+                d["required"] = True
+        sp_index = load_index(job["index"], job["graph"]) if job.get("index") else None
+        # distance à vide en km réels avec l'index, en sauts (1 km chacun) sinon
+        row["deadhead_metric"] = "km" if sp_index is not None else "hops"
+        solver = CARPSolver(capacity_limit=job["capacity"], sp_index=sp_index)
+        solver.depot_node = next(iter(G.nodes()))
+        tournees = solver.compute_tournees(G, job["strategy"])
+        row.update(analyze_solution_quality(tournees))
+        report = validate_tournees(G, tournees, solver.capacity_limit, solver.speed_kmh, solver.depot_node,
+                                   sp_index=sp_index)
+        # arêtes hors de portée (inaccessibles ou au-delà de la capacité) : écartées
+        # par le solveur et comptées ici plutôt que de bloquer le job
+        row.update(unserved_edges=len(solver.unserved_edges))
+        row.update(valid=report["valid"], missing_edges=len(report["missing_edges"]),
+                   duplicate_edges=len(report["duplicate_edges"]),
+                   over_capacity_routes=len(report["over_capacity_routes"]))
+
+    row["execution_time"] = round(time.time() - start_time, 3)
+    return row
+
+
+def _write_json(path: Path, data: Dict) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def _lease_expired(path: Path, lease_s: float) -> bool:
+    """
+    Un job de running/ est repris s'il a été réservé par cette machine (son
+    exécution a été interrompue) ou s'il l'a été il y a plus de lease_s
+    secondes par une autre ; sans réservation lisible, la date du fichier fait foi.
+    """
+    try:
+        claim = json.loads(path.read_text()).get("claim")
+    except (OSError, ValueError):
+        claim = None
+    if claim is None:
+        return time.time() - path.stat().st_mtime > lease_s
+    return claim["host"] == socket.gethostname() or time.time() - claim["claimed_at"] > lease_s
+
+
+def init_queue(queue_dir: Path, jobs: List[Dict], requeue_running: bool = False,
+               retry_failed: bool = False, lease_s: float = DEFAULT_LEASE_S) -> int:
+    """
+    Dépose dans pending/ les jobs absents de la file (quel que soit leur état).
+    Idempotent. Les jobs en échec restent dans failed/ tant que retry_failed
+    n'est pas demandé ; requeue_running ne reprend que les jobs de cette
+    machine ou dont la réservation date de plus de lease_s secondes, pour ne
+    pas relancer ceux qu'une autre machine exécute encore.
+    """
+    for state in QUEUE_STATES:
+        (queue_dir / state).mkdir(parents=True, exist_ok=True)
+
+    if requeue_running:
+        for path in (queue_dir / "running").glob("*.json"):
+            if _lease_expired(path, lease_s):
+                job = json.loads(path.read_text())
+                job.pop("claim", None)
+                _write_json(queue_dir / "pending" / path.name, job)
+                path.unlink()
+
+    if retry_failed:
+        for path in (queue_dir / "failed").glob("*.json"):
+            job = json.loads(path.read_text())
+            job.pop("error", None)
+            _write_json(queue_dir / "pending" / path.name, job)
+            path.unlink()
+
+    queued = 0
+    for job in jobs:
+        name = f"{job['job_id']}.json"
+        if any((queue_dir / state / name).exists() for state in QUEUE_STATES):
+            continue
+        _write_json(queue_dir / "pending" / name, job)
+        queued += 1
+    return queued
+
+
+def worker_loop(queue_dir: str) -> int:
+    """
+    Consomme la file jusqu'à épuisement. Un job est réservé par os.rename
+    pending/ -> running/ (atomique), ce qui permet à plusieurs machines
+    de partager le même répertoire ; l'entrée de running/ note ensuite la
+    machine, le processus et l'heure de réservation. Un job qui lève une exception est
+    déposé dans failed/ avec son erreur (voir init_queue(retry_failed=True)).
+    """
+    queue_dir = Path(queue_dir)
+    done = 0
+    while True:
+        pending = sorted((queue_dir / "pending").glob("*.json"))
+        if not pending:
+            return done
+        claimed = None
+        for path in pending:
+            target = queue_dir / "running" / path.name
+            try:
+                os.rename(path, target)
+            except FileNotFoundError:
+                continue
+            claimed = target
+            break
+        if claimed is None:
+            continue
+
+        job = json.loads(claimed.read_text())
+        claim = {"host": socket.gethostname(), "pid": os.getpid(), "claimed_at": time.time()}
+        _write_json(claimed, {**job, "claim": claim})
+        try:
+            _write_json(queue_dir / "done" / claimed.name, run_job(job))
+        except Exception as exc:
+            _write_json(queue_dir / "failed" / claimed.name, {**job, "error": repr(exc)})
+        claimed.unlink()
+        done += 1
+
+
+def collect_results(queue_dir: Path) -> pd.DataFrame:
+    rows = [json.loads(p.read_text()) for p in sorted((queue_dir / "done").glob("*.json"))]
+    df = pd.DataFrame(rows)
+    keys = [k for k in ("graph", "kind", "strategy", "capacity") if k in df]
+    return df.sort_values(keys, ignore_index=True) if keys else df
+
+
+def save_table(df: pd.DataFrame, out: Path) -> Path:
+    """
+    Écrit la table en CSV, ou en Parquet si out se termine par .parquet et
+    qu'un moteur (pyarrow ou fastparquet) est installé ; sinon repli en CSV.
+    """
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if out.suffix == ".parquet":
+        try:
+            df.to_parquet(out, index=False)
+            return out
+        except ImportError as exc:
+            out = out.with_suffix(".csv")
+            print(f" Parquet indisponible ({exc}) : repli en CSV")
+    df.to_csv(out, index=False)
+    return out
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Campagne de calcul sur tous les secteurs")
+    p.add_argument("--sectors", nargs="+", default=None,
+                   help="Secteurs de prepare_data.SECTORS (par défaut : tous)")
+    p.add_argument("--graphs", help="Motif glob de pickles (remplace --sectors)")
+    p.add_argument("--strategies", nargs="+", default=["nearest", "cheapest", "mixed"])
+    p.add_argument("--capacities", nargs="+", type=float, default=[8.0], help="Capacités (h)")
+    p.add_argument("--drone", action="store_true", help="Ajoute un job postier chinois par graphe")
+    p.add_argument("--index", help="Index CH orienté du graphe complet (graph_full.ch.npz) "
+                                   "pour les distances à vide des jobs véhicule hors split")
+    p.add_argument("--workers", type=int, default=os.cpu_count(), help="Processus locaux")
+    p.add_argument("--queue", default="data/results/queue", help="Répertoire de file (partageable)")
+    p.add_argument("--out", default="data/results/batch.csv",
+                   help="Table de résultats (.csv, ou .parquet avec pyarrow)")
+    p.add_argument("--requeue-running", action="store_true",
+                   help="Remet en attente les jobs d'une exécution interrompue")
+    p.add_argument("--lease", type=float, default=DEFAULT_LEASE_S / 3600,
+                   help="Avec --requeue-running : durée (h) après laquelle un job réservé "
+                        "par une autre machine est repris")
+    p.add_argument("--retry-failed", action="store_true", help="Remet en attente les jobs en échec")
+    p.add_argument("--worker-only", action="store_true",
+                   help="Consomme une file existante sans (re)construire la liste des jobs")
+    return p.parse_args(argv)
+
+
+def resolve_graphs(args) -> List[str]:
+    if args.graphs:
+        graph_paths = [g for g in sorted(glob.glob(args.graphs))
+                       if not g.endswith((".slim.pkl", ".geom.pkl"))]
+    else:
+        # import tardif : prepare_data dépend d'osmnx, inutile avec --graphs
+        from data.prepare_data import PROC_DIR, SECTORS
+
+        sectors = args.sectors if args.sectors is not None else list(SECTORS)
+        graph_paths = [str(PROC_DIR / f"graph_sector_{name}.pkl") for name in sectors]
+    return [g for g in graph_paths if Path(g).exists()]
+
 
-def run_pipeline():
-    print(" Chargement du graphe")
-    gpath = "data/processed/graph_sector_Verdun.pkl"
-    with open(gpath, "rb") as f:
-        G = pickle.load(f)
+def main(argv=None):
+    args = parse_args(argv)
+    queue_dir = Path(args.queue)
+    lease_s = args.lease * 3600
+    if args.worker_only:
+        if not (queue_dir / "pending").is_dir():
+            raise SystemExit(f"File introuvable : {queue_dir} (lancer d'abord sans --worker-only)")
+        init_queue(queue_dir, [], args.requeue_running, args.retry_failed, lease_s)
+    else:
+        graph_paths = resolve_graphs(args)
+        jobs = build_jobs(graph_paths, args.strategies, args.capacities, args.drone, args.index)
+        queued = init_queue(queue_dir, jobs, args.requeue_running, args.retry_failed, lease_s)
+        print(f" {len(jobs)} jobs sur {len(graph_paths)} graphes, {queued} nouveaux en file")
 
-    print(" Calcul des tournées de déneigement")
-    tournees = compute_tournees(G, strategy="mixed")
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            done = sum(pool.map(worker_loop, [str(queue_dir)] * args.workers))
+    else:
+        done = worker_loop(str(queue_dir))
+    print(f" {done} jobs exécutés sur cette machine")
+    failed = len(list((queue_dir / "failed").glob("*.json")))
+    if failed:
+        print(f" {failed} jobs en échec dans {queue_dir / 'failed'} (relancer avec --retry-failed)")
 
-    print(f"\n  Résultats ({len(tournees)} tournées) :")
-    for t in tournees:
-        print(f"  ▸ Tournée {t['id']}: {t['km']} km | {t['hours']} h | {t['utilization']}%")
+    df = collect_results(queue_dir)
+    out = save_table(df, Path(args.out))
+    print(f" Résultats ({len(df)} lignes) écrits dans {out}")
 
-    summary = analyze_solution_quality(tournees)
-    print("\n Synthèse globale :")
-    for k, v in summary.items():
-        print(f"  {k}: {v}")
 
 if __name__ == "__main__":
-    run_pipeline()
+    main()
@@ -0,0 +1,325 @@
+import heapq
+import itertools
+import math
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+try:
+    from .contraction import HOPS, edge_hops
+except ImportError:
+    from contraction import HOPS, edge_hops
+
+CHECKS = (
+    'missing_edges', 'duplicate_edges', 'non_required_edges', 'unknown_edges',
+    'empty_routes', 'over_capacity_routes', 'below_min_time_routes',
+    'km_mismatch_routes', 'num_edges_mismatch_routes', 'depot_unreachable_routes',
+)
+
+def index_edges(G: nx.Graph) -> Dict:
+    """
+    Indexe les arêtes de G dans l'ordre de G.edges : une arête de tournée
+    (u, v, data) est identifiée par id(data), le dictionnaire d'attributs
+    partagé avec le graphe (ce qui distingue aussi les arêtes parallèles).
+    """
+    node_index = {n: i for i, n in enumerate(G.nodes())}
+    m = G.number_of_edges()
+    edge_ids = {}
+    u_idx = np.empty(m, dtype=np.int64)
+    v_idx = np.empty(m, dtype=np.int64)
+    length_km = np.empty(m)
+    required = np.empty(m, dtype=bool)
+    hops = np.empty(m, dtype=np.float64)
+
+    for i, (u, v, data) in enumerate(G.edges(data=True)):
+        edge_ids[id(data)] = i
+        u_idx[i] = node_index[u]
+        v_idx[i] = node_index[v]
+        length_km[i] = data.get('length_m', 1000) / 1000
+        required[i] = bool(data.get('required', False))
+        hops[i] = data.get(HOPS, 1)
+
+    return {
+        'edge_ids': edge_ids,
+        'node_index': node_index,
+        'u': u_idx,
+        'v': v_idx,
+        'length_km': length_km,
+        'required': required,
+        'hops': hops,
+        'directed': G.is_directed(),
+    }
+
+
+def _hop_matrix(index: Dict) -> csr_matrix:
+    """
+    Matrice d'adjacence creuse des nœuds de G pondérée en arêtes d'origine
+    (hops), la plus courte des arêtes parallèles ; symétrique si G est non orienté.
+    """
+    n = len(index['node_index'])
+    u, v, w = index['u'], index['v'], index['hops']
+    if not index['directed']:
+        u, v, w = np.concatenate((u, v)), np.concatenate((v, u)), np.concatenate((w, w))
+    order = np.lexsort((w, v, u))
+    u, v, w = u[order], v[order], w[order]
+    first = np.ones(len(u), dtype=bool)
+    first[1:] = (u[1:] != u[:-1]) | (v[1:] != v[:-1])
+    return csr_matrix((w[first], (u[first], v[first])), shape=(n, n))
+
+
+class _HopRows:
+    """
+    Distances à vide en arêtes d'origine, mises en cache par source : la
+    recherche (BFS, ou Dijkstra sur hops si weight == HOPS) depuis une source
+    s'arrête à la cible demandée et reprend là où elle s'était arrêtée si une
+    cible plus lointaine est demandée ensuite.
+    """
+
+    def __init__(self, G: nx.Graph, weight: Optional[str]):
+        self.G = G
+        self.weight = weight
+        self._searches: Dict = {}
+
+    def __call__(self, source, target) -> float:
+        search = self._searches.get(source)
+        if search is not None and target in search[0]:
+            return search[0][target]
+        if search is None:
+            frontier = deque([source]) if self.weight is None else [(0, 0, source)]
+            search = self._searches[source] = ({source: 0}, {source: 0}, frontier, itertools.count(1))
+        settled, dist, frontier, order = search
+        if self.weight is None:
+            # BFS : la distance d'un nœud est définitive dès sa découverte
+            while target not in settled and frontier:
+                node = frontier.popleft()
+                for nbr in self.G.neighbors(node):
+                    if nbr not in settled:
+                        settled[nbr] = settled[node] + 1
+                        frontier.append(nbr)
+        else:
+            while target not in settled and frontier:
+                d, _, node = heapq.heappop(frontier)
+                if node in settled and settled[node] < d:
+                    continue
+                settled[node] = d
+                for nbr in self.G.neighbors(node):
+                    nd = d + edge_hops(self.G, node, nbr)
+                    if nbr not in settled and nd < dist.get(nbr, math.inf):
+                        dist[nbr] = nd
+                        heapq.heappush(frontier, (nd, next(order), nbr))
+        return settled.get(target, math.inf)
+
+
+class _DepotRow:
+    """Distances dépôt -> nœud (ou nœud -> dépôt) lues dans un DistanceTable, par indice de nœud."""
+
+    def __init__(self, table, depot, nodes: List, reverse: bool = False):
+        self.table = table
+        self.depot = depot
+        self.nodes = nodes
+        self.reverse = reverse
+
+    def __getitem__(self, i) -> float:
+        if self.reverse:
+            return self.table[self.nodes[i]][self.depot]
+        return self.table[self.depot][self.nodes[i]]
+
+
+def _pair_lengths(b: np.ndarray, a: np.ndarray, nodes: List, hop_matrix: Optional[csr_matrix],
+                  lookup: Callable, max_hops: int = 4) -> np.ndarray:
+    """
+    Distances à vide b[i] -> a[i] (indices de nœuds). Sans index, les paires
+    proches (cas courant entre deux arêtes consécutives d'une tournée) sont
+    résolues en bloc, palier par palier : les hops étant des entiers >= 1,
+    les nœuds à au plus k sauts de b sont ceux à au plus k - w sauts suivis
+    d'une arête de hops w. Au-delà de max_hops, lookup (recherches mises en
+    cache par source).
+    """
+    out = np.where(b == a, 0.0, np.nan)
+    rest = np.flatnonzero(b != a)
+    if hop_matrix is not None and len(rest):
+        steps = [(hop_matrix == w).astype(np.float64) for w in range(1, max_hops + 1)]
+        # reach[j][i] : nœuds à au plus j sauts de b[rest[i]]
+        reach = [csr_matrix((np.ones(len(rest)), (np.arange(len(rest)), b[rest])),
+                            shape=(len(rest), hop_matrix.shape[0]))]
+        for k in range(1, max_hops + 1):
+            layer = reach[-1] + sum(reach[k - w] @ steps[w - 1] for w in range(1, k + 1))
+            layer.data[:] = 1.0
+            hit = np.asarray(layer[np.arange(len(rest)), a[rest]]).ravel() > 0
+            out[rest[hit]] = k
+            rest = rest[~hit]
+            if not len(rest):
+                break
+            reach = [r[~hit] for r in reach] + [layer[~hit]]
+    for i in rest.tolist():
+        out[i] = lookup(nodes[b[i]], nodes[a[i]])
+    return out
+
+
+def _min_deadhead(index: Dict, served: np.ndarray, offsets: np.ndarray, depots: List,
+                  depot_lengths: Dict, nodes: List, hop_matrix: Optional[csr_matrix],
+                  lookup: Callable) -> np.ndarray:
+    """
+    Distance à vide minimale de chaque tournée dépôt -> arêtes dans l'ordre ->
+    dépôt : une borne inférieure de ce qu'a parcouru le solveur. Graphe
+    orienté : chaque arête dans son sens, la somme se calcule en bloc. Non
+    orienté : programmation dynamique sur les deux sens de service.
+    """
+    num_routes = len(offsets) - 1
+    deadhead = np.zeros(num_routes)
+    su = index['u'][served]
+    sv = index['v'][served]
+    # positions k dont l'arête précédente est dans la même tournée
+    gaps = np.ones(len(served), dtype=bool)
+    gaps[offsets[:-1][offsets[:-1] < len(served)]] = False
+    k = np.flatnonzero(gaps)
+
+    def pair(b, a):
+        g = np.zeros(len(served))
+        g[k] = _pair_lengths(b[k - 1], a[k], nodes, hop_matrix, lookup)
+        return g
+
+    bad_route = np.zeros(num_routes, dtype=bool)
+    unknown = np.flatnonzero(served < 0)
+    bad_route[np.searchsorted(offsets, unknown, side='right') - 1] = True
+    routes = [r for r in range(num_routes)
+              if offsets[r] < offsets[r + 1] and not bad_route[r] and depots[r] in depot_lengths]
+
+    if index['directed']:
+        g = pair(sv, su)
+        total = np.concatenate(([0.0], np.cumsum(g)))
+        for r in routes:
+            lo, hi = offsets[r], offsets[r + 1]
+            from_depot, to_depot = depot_lengths[depots[r]]
+            deadhead[r] = from_depot[su[lo]] + total[hi] - total[lo + 1] + to_depot[sv[hi - 1]]
+        return deadhead
+
+    # gXY : fin de l'arête précédente servie dans le sens X -> début de la suivante dans le sens Y
+    g00, g01 = pair(sv, su).tolist(), pair(sv, sv).tolist()
+    g10, g11 = pair(su, su).tolist(), pair(su, sv).tolist()
+    for r in routes:
+        lo, hi = int(offsets[r]), int(offsets[r + 1])
+        from_depot, to_depot = depot_lengths[depots[r]]
+        c0, c1 = from_depot[su[lo]], from_depot[sv[lo]]
+        for i in range(lo + 1, hi):
+            c0, c1 = min(c0 + g00[i], c1 + g10[i]), min(c0 + g01[i], c1 + g11[i])
+        deadhead[r] = min(c0 + to_depot[sv[hi - 1]], c1 + to_depot[su[hi - 1]])
+    return deadhead
+
+
+def validate_tournees(G: nx.Graph, tournees: List[Dict], capacity_limit: float = 8.0,
+                      speed_kmh: float = 10.0, depot: Optional[int] = 0,
+                      tol: float = 0.01, index: Optional[Dict] = None,
+                      check_deadhead: bool = True, sp_index=None) -> Dict:
+    """
+    Vérifie une solution de compute_tournees par opérations ensemblistes numpy :
+      - couverture : chaque arête requise servie exactement une fois
+      - arêtes inconnues du graphe ou non requises servies
+      - tournées vides, num_edges incohérent
+      - capacité (hours <= capacity_limit)
+      - hours >= temps de service + temps à vide minimal recalculé depuis la
+        séquence d'arêtes et le dépôt dans la métrique du solveur (hops, ou
+        km de sp_index ; arêtes orientées servies de u vers v) : une
+        recherche csgraph par dépôt et des écarts résolus en bloc, ~0.2 s
+        pour 51k arêtes sur une grille 160x160 (~0.1 s avec
+        check_deadhead=False)
+      - km == hours * speed_kmh : cohérence interne, convention du solveur
+      - dépôt : première arête atteignable depuis le dépôt, retour possible
+        depuis la dernière (dépôt de la tournée, sinon `depot`)
+    Les listes renvoyées contiennent des indices d'arêtes (ordre de G.edges)
+    ou des identifiants de tournées.
+    """
+    if index is None:
+        index = index_edges(G)
+    edge_ids = index['edge_ids']
+    m = len(index['required'])
+
+    counts = np.array([len(t['edges']) for t in tournees], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    served = np.fromiter((edge_ids.get(id(e[2]), -1) for t in tournees for e in t['edges']),
+                         dtype=np.int64, count=int(offsets[-1]))
+    route_ids = np.array([t.get('id', i + 1) for i, t in enumerate(tournees)], dtype=np.int64)
+    route_of = np.repeat(np.arange(len(tournees)), counts)
+
+    known = served >= 0
+    service_count = np.bincount(served[known], minlength=m)
+    required = index['required']
+
+    missing = np.flatnonzero(required & (service_count == 0))
+    duplicated = np.flatnonzero(service_count > 1)
+    not_required = np.flatnonzero(~required & (service_count > 0))
+
+    hours = np.array([t['hours'] for t in tournees], dtype=np.float64)
+    km = np.array([t['km'] for t in tournees], dtype=np.float64)
+    num_edges = np.array([t.get('num_edges', len(t['edges'])) for t in tournees], dtype=np.int64)
+    service_hours = np.bincount(route_of[known], weights=index['length_km'][served[known]] / speed_kmh,
+                                minlength=len(tournees))
+
+    empty = counts == 0
+    over_capacity = hours > capacity_limit + tol
+    depots = [t.get('depot', depot) for t in tournees]
+    nodes = list(index['node_index'])
+    hop_matrix = _hop_matrix(index)
+    # une recherche depuis et une vers chaque dépôt (csgraph), en sauts : sert à
+    # l'accessibilité et, sans sp_index, aux trajets dépôt <-> tournée
+    depot_hops = {}
+    for d in set(depots) - {None}:
+        if d in index['node_index']:
+            i = index['node_index'][d]
+            from_depot = dijkstra(hop_matrix, indices=i)
+            to_depot = dijkstra(hop_matrix.T.tocsr(), indices=i) if index['directed'] else from_depot
+            depot_hops[d] = (from_depot, to_depot)
+
+    deadhead = np.zeros(len(tournees))
+    if check_deadhead:
+        if sp_index is None:
+            deadhead = _min_deadhead(index, served, offsets, depots, depot_hops, nodes,
+                                     hop_matrix, _HopRows(G, HOPS if (index['hops'] != 1).any() else None))
+        else:
+            table = sp_index.table(scale=1 / 1000, targets=depot_hops)
+            depot_km = {d: (_DepotRow(table, d, nodes), _DepotRow(table, d, nodes, reverse=True))
+                        for d in depot_hops}
+            deadhead = _min_deadhead(index, served, offsets, depots, depot_km, nodes,
+                                     None, lambda source, target: table[source][target])
+    below_min_time = hours < service_hours + deadhead / speed_kmh - tol
+    km_mismatch = np.abs(km - hours * speed_kmh) > 0.005 * speed_kmh + 0.005 + 1e-9
+    bad_num_edges = num_edges != counts
+
+    depot_unreachable = np.zeros(len(tournees), dtype=bool)
+    for d in set(depots) - {None}:
+        routes = np.flatnonzero(np.array([x == d for x in depots], dtype=bool) & ~empty)
+        if d not in depot_hops:
+            depot_unreachable[routes] = True
+            continue
+        reach_from, reach_to = (np.isfinite(x) for x in depot_hops[d])
+        first = served[offsets[routes]]
+        last = served[offsets[routes + 1] - 1]
+        if index['directed']:
+            ok_first = (first >= 0) & reach_from[index['u'][first]]
+            ok_last = (last >= 0) & reach_to[index['v'][last]]
+        else:
+            ok_first = (first >= 0) & (reach_from[index['u'][first]] | reach_from[index['v'][first]])
+            ok_last = (last >= 0) & (reach_to[index['u'][last]] | reach_to[index['v'][last]])
+        depot_unreachable[routes] = ~(ok_first & ok_last)
+
+    report = {
+        'num_routes': len(tournees),
+        'num_required': int(required.sum()),
+        'missing_edges': missing.tolist(),
+        'duplicate_edges': duplicated.tolist(),
+        'non_required_edges': not_required.tolist(),
+        'unknown_edges': int((~known).sum()),
+        'empty_routes': route_ids[empty].tolist(),
+        'over_capacity_routes': route_ids[over_capacity].tolist(),
+        'below_min_time_routes': route_ids[below_min_time].tolist(),
+        'km_mismatch_routes': route_ids[km_mismatch].tolist(),
+        'num_edges_mismatch_routes': route_ids[bad_num_edges].tolist(),
+        'depot_unreachable_routes': route_ids[depot_unreachable].tolist(),
+        'service_km': round(float(service_hours.sum() * speed_kmh), 2),
+    }
+    report['valid'] = not any(report[k] for k in CHECKS)
+    return report
@@ -0,0 +1,15 @@
+# tests/conftest.py
+import networkx as nx
+import pytest
+
+
+@pytest.fixture
+def make_ladder():
+    """Échelle n x 2 dont toutes les arêtes (500 m) sont requises."""
+    def _make(n=6):
+        G = nx.ladder_graph(n)
+        for u, v, d in G.edges(data=True):
+            d["length_m"] = 500
+            d["required"] = True
+        return G
+    return _make
@@ -0,0 +1,148 @@
+# tests/test_carp_mvp.py
+import sys
+import pathlib
+import networkx as nx
+import pytest
+
+
+root = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from src.carp_mvp import CARPSolver
+from src.ch_index import ShortestPathIndex
+from src.validation import validate_tournees
+
+
+def test_multi_depot_covers_every_required_edge(make_ladder):
+    G = make_ladder()
+    solver = CARPSolver(capacity_limit=2.0)
+    tours = solver.compute_tournees_multi_depot(G, depots=[0, 5], workers=1)
+
+    served = [id(e[2]) for t in tours for e in t["edges"]]
+    required = [id(d) for _, _, d in G.edges(data=True)]
+    assert sorted(served) == sorted(required)
+    assert {t["depot"] for t in tours} == {0, 5}
+    assert [t["id"] for t in tours] == list(range(1, len(tours) + 1))
+
+
+def test_split_strategy_serves_each_edge_once_within_capacity(make_ladder):
+    G = make_ladder(8)
+    solver = CARPSolver(capacity_limit=1.5)
+    tours = solver.compute_tournees(G, strategy="split")
+
+    # le bout de l'échelle est trop loin du dépôt pour une tournée de 1.5 h
+    served = [id(e[2]) for t in tours for e in t["edges"]] + [id(e[2]) for e in solver.unserved_edges]
+    assert sorted(served) == sorted(id(d) for _, _, d in G.edges(data=True))
+    assert sorted((u, v) for u, v, _ in solver.unserved_edges) == [(7, 15), (14, 15)]
+    assert all(t["hours"] <= 1.5 for t in tours)
+
+
+def test_split_rejects_shortest_path_index(make_ladder):
+    G = make_ladder()
+    solver = CARPSolver(sp_index=ShortestPathIndex.build(G, weight="length_m"))
+    with pytest.raises(ValueError):
+        solver.compute_tournees(G, strategy="split")
+
+
+def make_one_way_grid(n=8):
+    """Grille orientée fortement connexe : rues horizontales à sens unique alterné."""
+    grid = nx.convert_node_labels_to_integers(nx.grid_2d_graph(n, n))
+    G = nx.MultiDiGraph()
+    for u, v in grid.edges():
+        a, b = sorted((u, v))
+        if b - a == 1 and (a // n) % 2 == 1:
+            a, b = b, a
+        G.add_edge(a, b, length_m=500, required=True)
+        if b - a == n or a - b == n:
+            G.add_edge(b, a, length_m=500, required=True)
+    return G
+
+
+def test_multi_depot_on_one_way_streets_with_process_pool():
+    G = make_one_way_grid()
+    assert nx.is_strongly_connected(G)
+    solver = CARPSolver(capacity_limit=2.0)
+    tours = solver.compute_tournees_multi_depot(G, depots=[0, 63], workers=2)
+
+    served = [id(e[2]) for t in tours for e in t["edges"]]
+    assert sorted(served) == sorted(id(d) for _, _, d in G.edges(data=True))
+    assert {t["depot"] for t in tours} == {0, 63}
+    assert solver.unserved_edges == []
+
+
+def test_multi_depot_excludes_unreachable_required_edges(make_ladder):
+    G = make_ladder()
+    G.add_edge(100, 101, length_m=500, required=True)
+    solver = CARPSolver(capacity_limit=2.0)
+    tours = solver.compute_tournees_multi_depot(G, depots=[0, 5], workers=1)
+
+    served = {id(e[2]) for t in tours for e in t["edges"]}
+    assert id(G[100][101]) not in served
+    assert len(served) == G.number_of_edges() - 1
+    assert [(u, v) for u, v, _ in solver.unserved_edges] == [(100, 101)]
+
+
+def test_split_excludes_unreachable_required_edges(make_ladder):
+    G = make_ladder()
+    G.add_edge(100, 101, length_m=500, required=True)
+    solver = CARPSolver(capacity_limit=2.0)
+    tours = solver.compute_tournees(G, strategy="split")
+
+    assert all(t["hours"] < 2.0 for t in tours)
+    assert sum(t["num_edges"] for t in tours) == G.number_of_edges() - 1
+    assert [(u, v) for u, v, _ in solver.unserved_edges] == [(100, 101)]
+
+
+class CountingDict(dict):
+    """dict dont les appels à get sont comptés."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.calls = 0
+
+    def get(self, *args):
+        self.calls += 1
+        return super().get(*args)
+
+
+def test_split_giant_tour_scales_linearly():
+    def split_iterations(n):
+        # chemin de n arêtes de 1,25 km (7,5 min de service) : au plus 16 par tournée de 2 h
+        required = [(i, i + 1, {"length_m": 1250}) for i in range(n)]
+        giant_tour = [(i, i, i + 1, 0) for i in range(n)]
+        depot_hops = {i: 0 for i in range(n + 1)}
+        to_depot = CountingDict(depot_hops)
+        CARPSolver(capacity_limit=2.0)._split_giant_tour(required, giant_tour, depot_hops, to_depot)
+        return to_depot.calls
+
+    # une itération de la boucle interne par tournée candidate (début, fin) : O(n * b), b = 16
+    for n in (250, 2000):
+        assert split_iterations(n) == 16 * n - 16 * 15 // 2
+
+
+def test_split_on_one_way_streets_reports_feasible_times():
+    G = make_one_way_grid()
+    solver = CARPSolver(capacity_limit=4.0)
+    tours = solver.compute_tournees(G, strategy="split")
+
+    report = validate_tournees(G, tours, solver.capacity_limit, solver.speed_kmh, solver.depot_node)
+    assert report["valid"], report
+
+
+def test_edges_beyond_capacity_are_excluded_not_looped_on():
+    G = nx.path_graph(40)
+    for _, _, d in G.edges(data=True):
+        d["length_m"] = 500
+        d["required"] = True
+    solver = CARPSolver(capacity_limit=1.0)
+
+    # aller-retour dépôt -> (k, k+1) -> dépôt : (2k + 1.5) km à 10 km/h, k <= 4 tient en 1 h
+    tours = solver.compute_tournees_multi_depot(G, depots=[0, 39], workers=1)
+    served = sorted(tuple(sorted((u, v))) for t in tours for u, v, _ in t["edges"])
+    assert served == [(k, k + 1) for k in range(5)] + [(38 - k, 39 - k) for k in range(5)][::-1]
+    assert len(solver.unserved_edges) == 29
+    assert all(t["hours"] <= 1.0 for t in tours)
+
+    tours = solver.compute_tournees(G, strategy="mixed")
+    assert sum(t["num_edges"] for t in tours) == 5
+    assert len(solver.unserved_edges) == 34
@@ -0,0 +1,92 @@
+# tests/test_ch_index.py
+import sys
+import pathlib
+import random
+import networkx as nx
+import pytest
+
+
+root = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from src.ch_index import ShortestPathIndex
+
+
+def make_city(seed=0):
+    random.seed(seed)
+    G = nx.MultiDiGraph(nx.convert_node_labels_to_integers(nx.grid_2d_graph(15, 15)).to_directed())
+    for u, v, d in G.edges(data=True):
+        d["length"] = random.uniform(50, 150)
+    G.remove_edges_from(random.sample(list(G.edges(keys=True)), 100))
+    return G
+
+
+def test_index_matches_dijkstra_after_reload(tmp_path):
+    G = make_city()
+    out = tmp_path / "graph.ch.npz"
+    ShortestPathIndex.build(G).save(out)
+    index = ShortestPathIndex.load(out)
+
+    source = 0
+    ref = nx.single_source_dijkstra_path_length(G, source, weight="length")
+    dists = index.distances(source, list(G.nodes()))
+    for t in G.nodes():
+        assert abs(dists[t] - ref.get(t, float("inf"))) < 1e-6
+
+    target = max(ref, key=ref.get)
+    path = index.path(source, target)
+    length = sum(min(d["length"] for d in G[a][b].values()) for a, b in zip(path[:-1], path[1:]))
+    assert path[0] == source and path[-1] == target
+    assert abs(length - ref[target]) < 1e-6
+
+
+def test_table_with_targets_matches_dijkstra():
+    G = make_city(seed=1)
+    index = ShortestPathIndex.build(G)
+    targets = list(G.nodes())[::7]
+    table = index.table(targets=targets)
+
+    for source in (0, 112, 224):
+        ref = nx.single_source_dijkstra_path_length(G, source, weight="length")
+        for t in targets + [source, 5]:
+            assert abs(table[source][t] - ref.get(t, float("inf"))) < 1e-6
+
+
+def test_check_graph_rejects_other_graph():
+    G = make_city()
+    index = ShortestPathIndex.build(G)
+    sub = G.subgraph(range(50))
+    assert index.covers(sub, exact=False) and not index.covers(sub)
+    with pytest.raises(ValueError):
+        index.check_graph(sub)
+
+
+def test_reload_with_non_integer_node_ids(tmp_path):
+    G = nx.grid_2d_graph(4, 4)
+    index = ShortestPathIndex.build(G, weight=None)
+    index.save(tmp_path / "grid.ch_und.npz")
+    index = ShortestPathIndex.load(tmp_path / "grid.ch_und.npz")
+
+    assert index.distance((0, 0), (3, 3)) == 6
+    path = index.path((0, 0), (3, 3))
+    assert path[0] == (0, 0) and path[-1] == (3, 3) and len(path) == 7
+
+
+def test_relabelled_view_for_slim_graph_survives_pickle():
+    import pickle
+
+    G = make_city()
+    osm = nx.relabel_nodes(G, {n: 10_000 + 7 * n for n in G})
+    index = ShortestPathIndex.build(osm)
+    ids = [10_000 + 7 * n for n in G]
+    view = pickle.loads(pickle.dumps(index.relabel(ids)))
+
+    assert view.covers(G)
+    assert not view.covers(G.subgraph(range(10)))
+    ref = nx.single_source_dijkstra_path_length(G, 0, weight="length")
+    target = max(ref, key=ref.get)
+    assert abs(view.distance(0, target) - ref[target]) < 1e-6
+    assert view.path(0, target)[-1] == target
+
+    partial = index.relabel(ids[:50])
+    assert not partial.covers(G, exact=False)
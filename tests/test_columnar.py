@@ -0,0 +1,49 @@
+# tests/test_columnar.py
+import sys
+import pathlib
+import pickle
+
+
+root = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from src.carp_mvp import CARPSolver, analyze_solution_quality
+from src.columnar import ColumnarSolutions, analyze_batch
+from src.validation import validate_tournees
+
+
+def test_batch_analysis_matches_per_solution_analysis(tmp_path, make_ladder):
+    G = make_ladder(8)
+    solver = CARPSolver(capacity_limit=1.5)
+    solutions = [solver.compute_tournees(G, s) for s in ("nearest", "mixed", "split")]
+
+    half = ColumnarSolutions.from_tournees(solutions[:1], G)
+    rest = pickle.loads(pickle.dumps(ColumnarSolutions.from_tournees(solutions[1:], G)))
+    batch = ColumnarSolutions.concat([half, rest])
+    batch.save(tmp_path / "batch.npz")
+    batch = ColumnarSolutions.load(tmp_path / "batch.npz")
+
+    kpis = analyze_batch(batch)
+    for s, tournees in enumerate(solutions):
+        expected = analyze_solution_quality(tournees)
+        assert {k: kpis[k][s] for k in expected} == expected
+
+    rebuilt = batch.to_tournees(G, 2)
+    assert [len(r["edges"]) for r in rebuilt] == [t["num_edges"] for t in solutions[2]]
+    assert all(a[2] is b[2] for r, t in zip(rebuilt, solutions[2]) for a, b in zip(r["edges"], t["edges"]))
+
+
+def test_depots_survive_concat_save_and_load(tmp_path, make_ladder):
+    G = make_ladder()
+    solver = CARPSolver(capacity_limit=2.0)
+    multi = solver.compute_tournees_multi_depot(G, depots=[0, 5], workers=1)
+    single = solver.compute_tournees(G, "split")
+
+    batch = ColumnarSolutions.concat([ColumnarSolutions.from_tournees([multi], G),
+                                      ColumnarSolutions.from_tournees([single], G)])
+    batch.save(tmp_path / "batch.npz")
+    batch = ColumnarSolutions.load(tmp_path / "batch.npz")
+
+    assert [t["depot"] for t in batch.to_tournees(G, 0)] == [t["depot"] for t in multi]
+    assert all("depot" not in t for t in batch.to_tournees(G, 1))
+    assert validate_tournees(G, batch.to_tournees(G, 0), solver.capacity_limit, depot=None)["valid"]
@@ -0,0 +1,62 @@
+# tests/test_contraction.py
+import sys
+import pathlib
+import networkx as nx
+
+
+root = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from src.carp_mvp import CARPSolver
+from src.columnar import ColumnarSolutions
+from src.contraction import contract_deadhead_chains, expand_node_path
+from src.validation import validate_tournees
+
+
+def test_chain_is_contracted_and_expands_back():
+    G = nx.MultiDiGraph()
+    nx.add_path(G, [0, 1, 2, 3, 4, 5], length=10.0, required=False)
+    nx.add_path(G, [5, 4, 3, 2, 1, 0], length=10.0, required=False)
+    G.add_edge(0, 6, length=5.0, required=True)
+    G.add_edge(5, 7, length=5.0, required=True)
+    nx.add_path(G, [3, 8, 9], length=1.0, required=False)
+
+    H = contract_deadhead_chains(G, keep=[0])
+
+    assert set(H.nodes()) == {0, 5, 6, 7}
+    assert H[0][5][0]["length"] == 50.0
+    assert expand_node_path(H, [0, 5, 7]) == [0, 1, 2, 3, 4, 5, 7]
+    assert expand_node_path(H, [5, 0]) == [5, 4, 3, 2, 1, 0]
+
+
+def test_contraction_does_not_change_solution_cost():
+    G = nx.Graph()
+    nx.add_path(G, range(11), length_m=500, required=False)
+    block = nx.convert_node_labels_to_integers(nx.grid_2d_graph(3, 3), first_label=10)
+    G.add_edges_from(block.edges(), length_m=500, required=True)
+
+    H = contract_deadhead_chains(G, keep=[0])
+    assert H[0][10]["hops"] == 10
+
+    for strategy in ("nearest", "mixed", "split"):
+        solver = CARPSolver(capacity_limit=2.0)
+        expected = [t["hours"] for t in solver.compute_tournees(G, strategy)]
+        assert [t["hours"] for t in solver.compute_tournees(H, strategy)] == expected
+
+
+def test_solution_on_contracted_graph_validates_on_original():
+    G = nx.MultiDiGraph()
+    nx.add_path(G, range(8), length_m=500, required=False)
+    nx.add_path(G, reversed(range(8)), length_m=500, required=False)
+    for a, b in ((7, 8), (8, 9), (9, 7)):
+        G.add_edge(a, b, length_m=500, required=True)
+        G.add_edge(b, a, length_m=500, required=True)
+
+    H = contract_deadhead_chains(G, keep=[0])
+    assert H.number_of_nodes() < G.number_of_nodes()
+    solver = CARPSolver(capacity_limit=3.0)
+    tours = solver.compute_tournees(H, "split")
+
+    report = validate_tournees(G, tours, solver.capacity_limit, solver.speed_kmh, solver.depot_node)
+    assert report["valid"], report
+    assert ColumnarSolutions.from_tournees([tours], G).num_routes == len(tours)
@@ -0,0 +1,129 @@
+# tests/test_run_all.py
+import sys
+import json
+import pathlib
+import pickle
+import socket
+import time
+import networkx as nx
+
+
+root = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root / "src"))
+
+import run_all
+
+
+def write_graph(G, path):
+    with open(path, "wb") as f:
+        pickle.dump(G, f)
+    return str(path)
+
+
+def queue_names(queue_dir, state):
+    return sorted(p.stem for p in (queue_dir / state).glob("*.json"))
+
+
+def test_build_jobs_and_init_queue_are_idempotent(tmp_path):
+    jobs = run_all.build_jobs(["a.pkl", "b.pkl"], ["nearest", "mixed"], [4.0, 8.0], drone=True)
+    assert len(jobs) == 2 * 2 * 2 + 2
+    assert len({j["job_id"] for j in jobs}) == len(jobs)
+    assert jobs == run_all.build_jobs(["a.pkl", "b.pkl"], ["nearest", "mixed"], [4.0, 8.0], drone=True)
+
+    queue_dir = tmp_path / "queue"
+    assert run_all.init_queue(queue_dir, jobs) == len(jobs)
+    assert run_all.init_queue(queue_dir, jobs) == 0
+    assert len(queue_names(queue_dir, "pending")) == len(jobs)
+
+
+def test_worker_loop_failure_and_resume(tmp_path, make_ladder):
+    good = write_graph(make_ladder(), tmp_path / "graph_sector_good.pkl")
+    late = str(tmp_path / "graph_sector_late.pkl")
+    jobs = run_all.build_jobs([good, late], ["nearest"], [2.0])
+    queue_dir = tmp_path / "queue"
+    run_all.init_queue(queue_dir, jobs)
+
+    # exécution interrompue : un job resté dans running/
+    stale = queue_dir / "pending" / f"{jobs[0]['job_id']}.json"
+    claim = {"host": socket.gethostname(), "pid": 0, "claimed_at": time.time()}
+    (queue_dir / "running" / stale.name).write_text(json.dumps({**jobs[0], "claim": claim}))
+    stale.unlink()
+    assert run_all.worker_loop(str(queue_dir)) == 1
+    assert queue_names(queue_dir, "failed") == [jobs[1]["job_id"]]
+    assert "error" in json.loads((queue_dir / "failed" / f"{jobs[1]['job_id']}.json").read_text())
+
+    # relance : ni le job en cours ni l'échec ne sont repris par défaut
+    assert run_all.init_queue(queue_dir, jobs) == 0
+    assert queue_names(queue_dir, "pending") == []
+
+    write_graph(make_ladder(), late)
+    run_all.init_queue(queue_dir, jobs, requeue_running=True, retry_failed=True)
+    assert run_all.worker_loop(str(queue_dir)) == 2
+    assert queue_names(queue_dir, "done") == sorted(j["job_id"] for j in jobs)
+    assert queue_names(queue_dir, "failed") == queue_names(queue_dir, "running") == []
+
+    assert "claim" not in json.loads((queue_dir / "done" / f"{jobs[0]['job_id']}.json").read_text())
+    df = run_all.collect_results(queue_dir)
+    assert list(df["sector"]) == ["good", "late"]
+    assert (df["unserved_edges"] == 0).all()
+    assert df["valid"].all()
+    out = run_all.save_table(df, tmp_path / "batch.csv")
+    assert out.read_text().startswith("job_id")
+
+
+def test_main_with_graphs_then_worker_only(tmp_path, make_ladder):
+    write_graph(make_ladder(), tmp_path / "graph_sector_a.pkl")
+    queue_dir = tmp_path / "queue"
+    common = ["--workers", "1", "--queue", str(queue_dir), "--out", str(tmp_path / "batch.csv")]
+
+    run_all.main(["--graphs", str(tmp_path / "*.pkl"), "--strategies", "nearest"] + common)
+    # --graphs ne doit pas passer par prepare_data (osmnx)
+    assert "data.prepare_data" not in sys.modules
+    assert len(queue_names(queue_dir, "done")) == 1
+
+    run_all.init_queue(queue_dir, run_all.build_jobs([str(tmp_path / "graph_sector_a.pkl")], ["mixed"], [8.0]))
+    run_all.main(["--worker-only"] + common)
+    assert len(queue_names(queue_dir, "done")) == 2
+    assert queue_names(queue_dir, "pending") == []
+
+
+def test_requeue_running_keeps_jobs_leased_by_other_hosts(tmp_path):
+    jobs = run_all.build_jobs(["a.pkl", "b.pkl", "c.pkl"], ["nearest"], [8.0])
+    queue_dir = tmp_path / "queue"
+    run_all.init_queue(queue_dir, [])
+    claims = [{"host": "other", "pid": 1, "claimed_at": time.time()},
+              {"host": "other", "pid": 1, "claimed_at": time.time() - 7200},
+              {"host": socket.gethostname(), "pid": 1, "claimed_at": time.time()}]
+    for job, claim in zip(jobs, claims):
+        (queue_dir / "running" / f"{job['job_id']}.json").write_text(json.dumps({**job, "claim": claim}))
+
+    run_all.init_queue(queue_dir, jobs, requeue_running=True, lease_s=3600)
+    assert queue_names(queue_dir, "running") == [jobs[0]["job_id"]]
+    assert queue_names(queue_dir, "pending") == sorted(j["job_id"] for j in jobs[1:])
+    pending = json.loads((queue_dir / "pending" / f"{jobs[1]['job_id']}.json").read_text())
+    assert "claim" not in pending
+
+
+def test_index_is_relabelled_for_slim_graphs(tmp_path, make_ladder):
+    from ch_index import ShortestPathIndex
+    from data.slim import save_slim_graph
+
+    ladder = make_ladder()
+    for _, _, d in ladder.edges(data=True):
+        d["length"] = float(d["length_m"])
+    G = nx.relabel_nodes(ladder, {n: 90_000 + n for n in ladder})
+    graph = write_graph(G, tmp_path / "graph_sector_osm.pkl")
+    save_slim_graph(G, graph)
+    index_file = tmp_path / "graph_full.ch.npz"
+    ShortestPathIndex.build(G, weight="length").save(index_file)
+
+    jobs = run_all.build_jobs([graph], ["mixed", "split"], [2.0], index=str(index_file))
+    assert ["index" in j for j in jobs] == [True, False]
+    queue_dir = tmp_path / "queue"
+    run_all.init_queue(queue_dir, jobs)
+    assert run_all.worker_loop(str(queue_dir)) == 2
+
+    df = run_all.collect_results(queue_dir).set_index("strategy")
+    assert df.loc["mixed", "deadhead_metric"] == "km"
+    assert df.loc["split", "deadhead_metric"] == "hops"
+    assert df["valid"].all()
@@ -0,0 +1,60 @@
+# tests/test_slim.py
+import sys
+import pathlib
+import networkx as nx
+from shapely.geometry import LineString
+
+
+root = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from src.data.slim import load_geometry, load_node_ids, load_slim_arrays, load_slim_graph, save_slim_graph
+
+
+def make_osm_graph():
+    G = nx.MultiDiGraph(crs="EPSG:32188")
+    for osm_id, x, y in ((9001, 0.0, 0.0), (4242, 100.0, 0.0), (7777, 100.0, 50.0)):
+        G.add_node(osm_id, x=x, y=y, street_count=2)
+    G.add_edge(9001, 4242, length=100.0, required=1, name="rue A", highway="residential",
+               geometry=LineString([(0, 0), (100, 0)]))
+    G.add_edge(9001, 4242, length=120.0, required=0, name="rue A bis",
+               geometry=LineString([(0, 0), (50, 10), (100, 0)]))
+    G.add_edge(4242, 7777, length=50, osmid=123)
+    return G
+
+
+def test_slim_round_trip(tmp_path):
+    G = make_osm_graph()
+    graph_path = tmp_path / "graph_full.pkl"
+    save_slim_graph(G, graph_path)
+
+    H = load_slim_graph(graph_path)
+    node_ids = load_node_ids(graph_path)
+    geometry = load_geometry(graph_path)
+
+    assert list(H.nodes()) == [0, 1, 2]
+    assert node_ids.tolist() == [9001, 4242, 7777]
+    assert sorted((node_ids[u], node_ids[v], k) for u, v, k in H.edges(keys=True)) == sorted(G.edges(keys=True))
+
+    assert H[0][1][0] == {"length": 100.0, "required": True}
+    assert H[0][1][1] == {"length": 120.0, "required": False}
+    assert H[1][2][0] == {"length": 50.0, "required": False}
+    assert all(H.nodes[n] == {} for n in H)
+
+    assert geometry["crs"] == "EPSG:32188"
+    assert geometry["x"].tolist() == [0.0, 100.0, 100.0]
+    assert set(geometry["edges"]) == {(0, 1, 0), (0, 1, 1)}
+    assert geometry["edges"][(0, 1, 1)].equals(G[9001][4242][1]["geometry"])
+
+
+def test_slim_columns_are_typed(tmp_path):
+    graph_path = tmp_path / "graph_full.pkl"
+    save_slim_graph(make_osm_graph(), graph_path)
+    arrays = load_slim_arrays(graph_path)
+
+    assert {name: arrays[name].dtype.name for name in ("u", "v", "key", "length", "length_m", "required")} == {
+        "u": "int32", "v": "int32", "key": "int32",
+        "length": "float32", "length_m": "float32", "required": "bool",
+    }
+    assert arrays["required"].tolist() == [True, False, False]
+    assert load_node_ids(graph_path).dtype.kind == "i"
@@ -0,0 +1,80 @@
+# tests/test_storm_join.py
+import sys
+import pathlib
+import networkx as nx
+import pytest
+from shapely.geometry import LineString, Point, box
+
+
+root = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from src.data.storm_join import join_storm_layers, open_roads
+
+
+def make_street():
+    G = nx.MultiDiGraph()
+    for n in range(4):
+        G.add_node(n, x=100.0 * n, y=0.0)
+    for n in range(3):
+        G.add_edge(n, n + 1)
+    return G
+
+
+def edge_attr(G, name):
+    return [d[name] for _, _, d in G.edges(data=True)]
+
+
+def test_layers_can_be_joined_one_at_a_time():
+    G = make_street()
+    join_storm_layers(G, snow_points=[Point(50, 5), Point(150, 5), Point(250, 5)],
+                      snow_depth_cm=[5.0, 1.0, 25.0], max_distance=20)
+    assert edge_attr(G, "required") == [True, False, True]
+    assert edge_attr(G, "demand_m") == [100.0, 0.0, 300.0]
+
+    summary = join_storm_layers(G, closed_geoms=[LineString([(50, -10), (50, 10)])])
+    assert summary["closed_edges"] == 1
+    assert edge_attr(G, "snow_depth_cm") == [5.0, 1.0, 25.0]
+    assert edge_attr(G, "required") == [False, False, True]
+
+    join_storm_layers(G, priority_geoms=[box(140, -10, 160, 10)], priority_levels=[2])
+    assert edge_attr(G, "priority") == [0, 2, 0]
+    assert edge_attr(G, "closed") == [True, False, False]
+    assert edge_attr(G, "required") == [False, True, True]
+    assert edge_attr(G, "demand_m") == [0.0, 100.0, 300.0]
+
+    assert sorted(open_roads(G).edges()) == [(1, 2), (2, 3)]
+
+
+def test_snow_readings_only_reach_nearby_edges():
+    G = make_street()
+    summary = join_storm_layers(G, snow_points=[Point(150, 5)], snow_depth_cm=[5.0], max_distance=20)
+    assert summary["snow_matched_edges"] == 1
+    assert edge_attr(G, "snow_depth_cm") == [0.0, 5.0, 0.0]
+    assert edge_attr(G, "required") == [False, True, False]
+
+    with pytest.raises(ValueError):
+        join_storm_layers(G, snow_points=[Point(150, 5)], snow_depth_cm=[5.0])
+
+
+def test_reopened_street_is_required_again():
+    G = make_street()
+    join_storm_layers(G, snow_points=[Point(150, 5)], snow_depth_cm=[5.0], max_distance=200)
+    join_storm_layers(G, closed_geoms=[LineString([(50, -10), (50, 10)])])
+    assert edge_attr(G, "required") == [False, True, True]
+
+    join_storm_layers(G, closed_geoms=[])
+    assert edge_attr(G, "closed") == [False, False, False]
+    assert edge_attr(G, "required") == [True, True, True]
+    assert edge_attr(G, "demand_m") == [100.0, 100.0, 100.0]
+
+
+def test_reopening_keeps_required_of_graph_without_storm_layers():
+    G = make_street()
+    for _, v, d in G.edges(data=True):
+        d["required"] = v != 3
+    join_storm_layers(G, closed_geoms=[LineString([(50, -10), (50, 10)])])
+    assert edge_attr(G, "required") == [False, True, False]
+
+    join_storm_layers(G, closed_geoms=[])
+    assert edge_attr(G, "required") == [True, True, False]
@@ -0,0 +1,63 @@
+# tests/test_validation.py
+import sys
+import pathlib
+
+import networkx as nx
+
+root = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from src.carp_mvp import CARPSolver
+from src.validation import validate_tournees
+
+
+def test_solver_output_is_valid(make_ladder):
+    G = make_ladder()
+    solver = CARPSolver(capacity_limit=2.0)
+    for strategy in ("mixed", "split"):
+        tours = solver.compute_tournees(G, strategy)
+        report = validate_tournees(G, tours, solver.capacity_limit, solver.speed_kmh, solver.depot_node)
+        assert report["valid"], report
+
+
+def test_detects_dropped_duplicated_and_empty_routes(make_ladder):
+    G = make_ladder()
+    tours = CARPSolver(capacity_limit=1.2).compute_tournees(G, "split")
+    dropped = tours[0]["edges"].pop()
+    tours[1]["edges"].append(tours[1]["edges"][0])
+    tours.append({"id": 99, "edges": [], "km": 0.0, "hours": 0.0, "num_edges": 0})
+
+    report = validate_tournees(G, tours, capacity_limit=1.2)
+    edges = list(G.edges(data=True))
+    assert [edges[i][2] is dropped[2] for i in report["missing_edges"]] == [True]
+    assert len(report["duplicate_edges"]) == 1
+    assert report["empty_routes"] == [99]
+    assert not report["valid"]
+
+
+def test_detects_understated_travel_time(make_ladder):
+    G = make_ladder(8)
+    solver = CARPSolver(capacity_limit=1.5)
+    tours = solver.compute_tournees(G, "mixed")
+    service = sum(e[2]["length_m"] for e in tours[-1]["edges"]) / 1000 / solver.speed_kmh
+    tours[-1]["hours"] = round(service, 2)
+    tours[-1]["km"] = round(service * solver.speed_kmh, 2)
+
+    report = validate_tournees(G, tours, solver.capacity_limit, solver.speed_kmh, solver.depot_node)
+    assert report["below_min_time_routes"] == [tours[-1]["id"]]
+    assert report["km_mismatch_routes"] == []
+
+
+def test_one_way_edges_are_served_in_their_own_direction():
+    # 2 -> 1 à sens unique : le prendre à contre-sens depuis 1 serait plus court
+    G = nx.DiGraph()
+    G.add_edges_from([(0, 1), (1, 0), (0, 3), (3, 4), (4, 2)], length_m=1000, required=False)
+    G.add_edge(2, 1, length_m=1000, required=True)
+    tours = [{"id": 1, "edges": [(2, 1, G[2][1])], "km": 4.0, "hours": 0.4, "num_edges": 1}]
+    assert validate_tournees(G, tours, depot=0)["below_min_time_routes"] == [1]
+
+    solver = CARPSolver()
+    for strategy in ("nearest", "mixed", "split"):
+        tours = solver.compute_tournees(G, strategy)
+        assert tours[0]["hours"] == 0.5
+        assert validate_tournees(G, tours, depot=0)["valid"]